@@ -1,14 +1,19 @@
 import datetime
+import hashlib
 import json
 import os
+import posixpath
 import re
 import warnings
 from collections import defaultdict
+from functools import lru_cache
 from functools import partial
+from html import escape
 from pathlib import Path
 
 import pytest
 from jinja2 import Environment
+from jinja2 import FileSystemBytecodeCache
 from jinja2 import FileSystemLoader
 from jinja2 import select_autoescape
 
@@ -17,34 +22,36 @@ from pytest_html import extras
 from pytest_html.table import Header
 from pytest_html.table import Html
 from pytest_html.table import Row
+from pytest_html.util import ansi_support
 from pytest_html.util import cleanup_unserializable
+from pytest_html.util import encode_columnar
+from pytest_html.util import encode_rows
+from pytest_html.util import Profiler
 
-try:
-    from ansi2html import Ansi2HTMLConverter, style
+# Number of records per live update file, see BaseReport._append_delta
+DELTA_CHUNK_SIZE = 1000
 
-    converter = Ansi2HTMLConverter(inline=False, escaped=False)
-    _handle_ansi = partial(converter.convert, full=False)
-    _ansi_styles = style.get_styles()
-except ImportError:
-    from _pytest.logging import _remove_ansi_escape_sequences
-
-    _handle_ansi = _remove_ansi_escape_sequences
-    _ansi_styles = []
+# The outcomes included in the report of --html-failures-first
+FAILURE_RESULTS = ("Failed", "Error")
 
 
 class BaseReport:
     class ReportData:
-        def __init__(self, title, config):
+        def __init__(self, title, config, profiler=None):
             self._config = config
+            self._profiler = profiler or Profiler(enabled=False)
             self._data = {
                 "title": title,
                 "collectedItems": 0,
                 "runningState": "not_started",
                 "environment": {},
                 "tests": defaultdict(list),
+                "logs": [],
                 "resultsTableHeader": {},
                 "additionalSummary": defaultdict(list),
             }
+            self._log_ids = {}
+            self._log_refs = []
 
             collapsed = config.getini("render_collapsed")
             if collapsed:
@@ -91,8 +98,9 @@ class BaseReport:
                 report.when in ["setup", "teardown"] and report.outcome != "passed"
             ):
                 if not remove_log:
-                    processed_logs = _process_logs(report)
-                    test_data["log"] = _handle_ansi(processed_logs)
+                    with self._profiler.measure("logs"):
+                        processed_logs = _process_logs(report)
+                        test_data["log"] = self.add_log(_handle_ansi(processed_logs))
                 self._data["tests"][report.nodeid].append(test_data)
                 return True
 
@@ -107,28 +115,128 @@ class BaseReport:
                         if "teardown" in header:
                             log.append(f"{' ' + header + ' ':-^80}")
                             log.append(content)
-                    test["log"] += _handle_ansi("\n".join(log))
-
-    def __init__(self, report_path, config, default_css="style.css"):
+                    if log:
+                        with self._profiler.measure("logs"):
+                            log_id = test["log"]
+                            appended = self.get_log(log_id) + _handle_ansi(
+                                "\n".join(log)
+                            )
+                            test["log"] = self.add_log(appended)
+                            self.release_log(log_id)
+
+        def add_log(self, log):
+            # Logs are stored once and referenced by their index in the log
+            # table, e.g. the same traceback of every test using a broken fixture.
+            key = _log_key(log)
+            if key not in self._log_ids:
+                self._log_ids[key] = len(self._data["logs"])
+                self._data["logs"].append(log)
+                self._log_refs.append(0)
+            log_id = self._log_ids[key]
+            self._log_refs[log_id] += 1
+            return log_id
+
+        def get_log(self, log_id):
+            return self._data["logs"][log_id]
+
+        def release_log(self, log_id):
+            self._log_refs[log_id] -= 1
+            if not self._log_refs[log_id]:
+                del self._log_ids[_log_key(self.get_log(log_id))]
+                self._data["logs"][log_id] = None
+
+    # whether an open report is updated from the delta files, see _append_delta
+    _live_updates = True
+
+    def __init__(self, report_path, config, default_css="style.css", report_data=None):
         self._report_path = Path(os.path.expandvars(report_path)).expanduser()
         self._report_path.parent.mkdir(parents=True, exist_ok=True)
         self._resources_path = Path(__file__).parent.joinpath("resources")
         self._config = config
-        self._template = _read_template([self._resources_path])
+        self._template = _read_template(
+            (self._resources_path,), cache_dir=_template_cache_dir(config)
+        )
         self._css = _process_css(
             Path(self._resources_path, default_css), self._config.getoption("css")
         )
         self._max_asset_filename_length = int(
             config.getini("max_asset_filename_length")
         )
+        self._columnar_report_data = config.getini("columnar_report_data")
+        self._redact_matcher = _compile_redact_list(
+            config.getini("environment_table_redact_list")
+        )
+        self._environment = None
 
-        self._report = self.ReportData(self._report_path.name, config)
+        if report_data is None:
+            self._profiler = Profiler(enabled=config.getoption("html_profile"))
+            report_data = self.ReportData(
+                self._report_path.name, config, profiler=self._profiler
+            )
+        else:
+            self._profiler = report_data._profiler
+        self._report = report_data
+
+        # Additional reports written from the data of this one, see add_writer
+        self._writers = []
+        # The extras of each test as encoded by this report, when the report
+        # data holds the extras encoded by another report
+        self._writer_extras = {}
+
+        if not config.getoption("html_live_updates"):
+            self._live_updates = False
+        self._delta_prefix = f"{self._report_path.stem}.delta"
+        self._delta_sequence = 0
+        self._delta_emitted = defaultdict(int)
+        # the IDs of the logs already written to the delta files
+        self._delta_logs = set()
+
+        self._failures_path = None
+        if config.getoption("html_failures_first"):
+            self._failures_path = self._report_path.with_name(
+                f"{self._report_path.stem}-failures{self._report_path.suffix}"
+            )
+
+        # With --html-split the report is an index of pages of results
+        self._split = config.getoption("html_split")
+        self._pages = {}
+        self._page_keys = {}
+        if self._split is not None:
+            # the pages are reloaded instead
+            self._live_updates = False
+            self._index_template = _read_template(
+                (self._resources_path,),
+                "pages.jinja2",
+                cache_dir=_template_cache_dir(config),
+            )
 
     @property
     def css(self):
         # implement in subclasses
         return
 
+    @property
+    def script(self):
+        # the script is included in the report unless a subclass returns its URL
+        return
+
+    def add_writer(self, report_class, report_path):
+        """Also write a report of ``report_class`` to ``report_path``.
+
+        The hooks are only called once, by this report, and the test data is
+        shared: the added report only encodes the extras and writes its file.
+        """
+        writer = report_class(report_path, self._config, report_data=self._report)
+        self._writers.append(writer)
+        return writer
+
+    def _all_writers(self):
+        return [self, *self._writers]
+
+    def _writer_test(self, test):
+        extras = self._writer_extras.get(id(test))
+        return test if extras is None else {**test, "extras": extras}
+
     def _asset_filename(self, test_id, extra_index, test_index, file_extension):
         return "{}_{}_{}.{}".format(
             re.sub(r"[^\w.]", "_", test_id),
@@ -137,39 +245,203 @@ class BaseReport:
             file_extension,
         )[-self._max_asset_filename_length :]
 
-    def _generate_report(self, self_contained=False):
+    def _generate_report(self, self_contained=False, nodeid=None):
+        if self._split is None:
+            self._generate_page(self._report_path, self_contained)
+            return
+
+        if nodeid in self._page_keys:
+            # only the page of the updated test has changed
+            pages = [self._pages[self._page_keys[nodeid]]]
+        else:
+            pages = self._pages.values()
+        for page in pages:
+            self._generate_page(page.path, self_contained, page)
+        self._generate_index(self_contained)
+
+    def _generate_page(self, path, self_contained, page=None):
         generated = datetime.datetime.now()
+        prefix = self._report.data["additionalSummary"]["prefix"]
+        with self._profiler.measure("serialization"):
+            if page is None:
+                test_data = cleanup_unserializable(self._report.data)
+                if self._live_updates:
+                    test_data["deltaPrefix"] = self._delta_prefix
+                    test_data["deltaChunkSize"] = DELTA_CHUNK_SIZE
+                    test_data["deltaSequence"] = self._delta_sequence
+                tests = test_data["tests"]
+                if isinstance(tests, dict) and self._writer_extras:
+                    tests = {
+                        nodeid: [self._writer_test(test) for test in results]
+                        for nodeid, results in tests.items()
+                    }
+            else:
+                all_tests = self._report.data["tests"]
+                tests, logs = _select_logs(
+                    {
+                        nodeid: [
+                            self._writer_test(test)
+                            for test in all_tests[nodeid]
+                            if page.includes(test)
+                        ]
+                        for nodeid in page.nodeids
+                    },
+                    self._report.data["logs"],
+                )
+                test_data = cleanup_unserializable(
+                    {**self._report.data, "tests": tests, "logs": logs}
+                )
+                test_data["title"] = f"{test_data['title']}: {page.name}"
+                report_link = (
+                    f'<p><a href="{escape(self._report_path.name)}">'
+                    "All results</a></p>"
+                )
+                prefix = [report_link, *prefix]
+            if isinstance(tests, dict):
+                encode = encode_columnar if self._columnar_report_data else encode_rows
+                test_data["tests"] = encode(tests)
+            test_data = _escape_script_data(json.dumps(test_data))
+
         rendered_report = self._render_html(
             generated.strftime("%d-%b-%Y"),
             generated.strftime("%H:%M:%S"),
             __version__,
             self.css,
             self_contained=self_contained,
-            test_data=cleanup_unserializable(self._report.data),
-            prefix=self._report.data["additionalSummary"]["prefix"],
+            live_updates=self._live_updates and page is None,
+            test_data=test_data,
+            prefix=prefix,
             summary=self._report.data["additionalSummary"]["summary"],
             postfix=self._report.data["additionalSummary"]["postfix"],
         )
 
-        self._write_report(rendered_report)
+        self._write_report(rendered_report, path)
+
+    def _generate_index(self, self_contained):
+        generated = datetime.datetime.now()
+        totals = defaultdict(int)
+        for page in self._pages.values():
+            for result, count in page.counts.items():
+                totals[result] += count
+
+        with self._profiler.measure("template render"):
+            rendered_index = self._index_template.render(
+                title=self._report.title,
+                date=generated.strftime("%d-%b-%Y"),
+                time=generated.strftime("%H:%M:%S"),
+                version=__version__,
+                styles=self.css,
+                self_contained=self_contained,
+                pages=self._pages.values(),
+                totals=totals,
+                collected_items=self._report.data["collectedItems"],
+                finished=self._report.data["runningState"] == "Finished",
+            )
+
+        self._write_report(rendered_index)
+
+    def _generate_failures_report(self, self_contained=False):
+        # A small report to look at while the full report is being written
+        page = _Page("Failures", self._failures_path, results=FAILURE_RESULTS)
+        for nodeid, results in self._report.data["tests"].items():
+            if any(page.includes(test) for test in results):
+                page.nodeids.setdefault(nodeid)
+        self._generate_page(page.path, self_contained, page)
+
+    def _add_to_page(self, nodeid, result):
+        if self._split is None:
+            return
+        key = self._page_keys.get(nodeid)
+        if key is None:
+            key = self._page_keys[nodeid] = self._page_key(nodeid)
+        page = self._pages.get(key)
+        if page is None:
+            path = self._report_path.with_name(
+                f"{self._report_path.stem}-{len(self._pages) + 1}"
+                f"{self._report_path.suffix}"
+            )
+            name = f"Page {key + 1}" if isinstance(key, int) else key
+            page = self._pages[key] = _Page(name, path)
+        page.nodeids.setdefault(nodeid)
+        page.counts[result.lower()] += 1
+
+    def _page_key(self, nodeid):
+        module = nodeid.split("::")[0]
+        if self._split == "module":
+            return module
+        if self._split == "directory":
+            return posixpath.dirname(module) or "."
+        # a fixed number of test nodes per page, in the order they finished
+        return len(self._page_keys) // self._split
+
+    def _append_delta(self, record):
+        # Records are split over numbered files so that a live report only
+        # needs to load the files it has not fully seen yet.
+        if not self._live_updates:
+            return
+        self._delta_sequence += 1
+        record["sequence"] = self._delta_sequence
+        chunk = (self._delta_sequence - 1) // DELTA_CHUNK_SIZE
+        delta_path = self._report_path.parent / f"{self._delta_prefix}.{chunk}.js"
+        with delta_path.open("a", encoding="utf-8") as f:
+            f.write(f"pytestHtmlDelta({json.dumps(record)});\n")
+
+    def _append_test_delta(self, nodeid):
+        tests = self._report.data["tests"].get(nodeid, [])
+        start = self._delta_emitted[nodeid]
+        if len(tests) > start:
+            new_tests = [self._writer_test(test) for test in tests[start:]]
+            record = {
+                "nodeid": nodeid,
+                "start": start,
+                "tests": [cleanup_unserializable(test) for test in new_tests],
+            }
+            logs = self._new_delta_logs(new_tests)
+            if logs:
+                record["logs"] = logs
+            self._append_delta(record)
+            self._delta_emitted[nodeid] = len(tests)
+
+    def _new_delta_logs(self, tests):
+        # Tests reference the log table like the report does. A log is only
+        # included in the first record referencing it: an open report written
+        # before that record gets it from there, one written after it has the
+        # log in its own table.
+        logs = {}
+        for test in tests:
+            log_id = test.get("log")
+            if log_id is not None and log_id not in self._delta_logs:
+                self._delta_logs.add(log_id)
+                logs[log_id] = self._report.get_log(log_id)
+        return logs
+
+    def _remove_deltas(self):
+        for delta_path in self._report_path.parent.glob(f"{self._delta_prefix}.*.js"):
+            delta_path.unlink()
+
+    def _finish_deltas(self):
+        # The final report has all results: an open report reloads it, so the
+        # delta files are truncated to that request. This includes the file
+        # polled next when the last one is full.
+        if not self._live_updates:
+            return
+        record = json.dumps({"sequence": self._delta_sequence + 1, "reload": True})
+        for chunk in range(self._delta_sequence // DELTA_CHUNK_SIZE + 1):
+            delta_path = self._report_path.parent / f"{self._delta_prefix}.{chunk}.js"
+            delta_path.write_text(f"pytestHtmlDelta({record});\n", encoding="utf-8")
 
     def _generate_environment(self):
-        metadata = self._config._metadata
-        for key in metadata.keys():
-            value = metadata[key]
-            if self._is_redactable_environment_variable(key):
-                black_box_ascii_value = 0x2593
-                metadata[key] = "".join(chr(black_box_ascii_value) for _ in str(value))
+        if self._environment is None:
+            metadata = self._config._metadata
+            for key, value in metadata.items():
+                if self._is_redactable_environment_variable(key):
+                    metadata[key] = "\u2593" * len(str(value))
+            self._environment = metadata
 
-        return metadata
+        return self._environment
 
     def _is_redactable_environment_variable(self, environment_variable):
-        redactable_regexes = self._config.getini("environment_table_redact_list")
-        for redactable_regex in redactable_regexes:
-            if re.match(redactable_regex, environment_variable):
-                return True
-
-        return False
+        return bool(self._redact_matcher(environment_variable))
 
     def _data_content(self, *args, **kwargs):
         pass
@@ -179,8 +451,11 @@ class BaseReport:
 
     def _process_extras(self, report, test_id):
         test_index = hasattr(report, "rerun") and report.rerun + 1 or 0
-        report_extras = getattr(report, "extras", [])
-        for extra_index, extra in enumerate(report_extras):
+        report_extras = []
+        for extra_index, extra in enumerate(getattr(report, "extras", [])):
+            # every report encodes its own copy of the extras
+            extra = dict(extra)
+            report_extras.append(extra)
             content = extra["content"]
             asset_name = self._asset_filename(
                 test_id.encode("utf-8").decode("unicode_escape"),
@@ -215,26 +490,31 @@ class BaseReport:
         version,
         styles,
         self_contained,
+        live_updates,
         test_data,
         summary,
         prefix,
         postfix,
     ):
-        return self._template.render(
-            date=date,
-            time=time,
-            version=version,
-            styles=styles,
-            self_contained=self_contained,
-            test_data=json.dumps(test_data),
-            summary=summary,
-            prefix=prefix,
-            postfix=postfix,
-        )
+        with self._profiler.measure("template render"):
+            return self._template.render(
+                date=date,
+                time=time,
+                version=version,
+                styles=styles,
+                script=self.script,
+                self_contained=self_contained,
+                live_updates=live_updates,
+                test_data=test_data,
+                summary=summary,
+                prefix=prefix,
+                postfix=postfix,
+            )
 
-    def _write_report(self, rendered_report):
-        with self._report_path.open("w", encoding="utf-8") as f:
-            f.write(rendered_report)
+    def _write_report(self, rendered_report, path=None):
+        with self._profiler.measure("file write"):
+            with (path or self._report_path).open("w", encoding="utf-8") as f:
+                f.write(rendered_report)
 
     @pytest.hookimpl(trylast=True)
     def pytest_sessionstart(self, session):
@@ -247,10 +527,14 @@ class BaseReport:
         header_cells = Header()
         session.config.hook.pytest_html_results_table_header(cells=header_cells)
         self._report.set_data("resultsTableHeader", header_cells.html)
+        self._report.set_data("resultsTableSortables", header_cells.sortable_columns)
+        self._report.set_data("resultsTableColumns", header_cells.columns)
         self._report.set_data("headerPops", header_cells.get_pops())
 
         self._report.set_data("runningState", "Started")
-        self._generate_report()
+        for writer in self._all_writers():
+            writer._remove_deltas()
+            writer._generate_report()
 
     @pytest.hookimpl(trylast=True)
     def pytest_sessionfinish(self, session):
@@ -260,17 +544,42 @@ class BaseReport:
             postfix=self._report.data["additionalSummary"]["postfix"],
         )
         self._report.set_data("runningState", "Finished")
-        self._generate_report()
+        if self._profiler.enabled:
+            # the final report itself is not included
+            self._report.set_data("profile", self._profiler.phases)
+        if self._failures_path:
+            for writer in self._all_writers():
+                writer._generate_failures_report()
+        for writer in self._all_writers():
+            writer._generate_report()
+            writer._finish_deltas()
 
     @pytest.hookimpl(trylast=True)
     def pytest_terminal_summary(self, terminalreporter):
-        terminalreporter.write_sep(
-            "-", f"Generated html report: file://{self._report_path.resolve()}"
-        )
+        for writer in self._all_writers():
+            if writer._failures_path:
+                terminalreporter.write_sep(
+                    "-",
+                    "Generated html failures report: "
+                    f"file://{writer._failures_path.resolve()}",
+                )
+            terminalreporter.write_sep(
+                "-", f"Generated html report: file://{writer._report_path.resolve()}"
+            )
+        if self._profiler.enabled:
+            phases = self._profiler.phases
+            total = sum(phase["seconds"] for phase in phases.values())
+            terminalreporter.write_line(f"html report profile: {total:.3f}s")
+            for name, phase in phases.items():
+                terminalreporter.write_line(
+                    f"  {name:<20} {phase['calls']:>8} calls {phase['seconds']:>9.3f}s"
+                )
 
     @pytest.hookimpl(trylast=True)
     def pytest_collection_finish(self, session):
         self._report.set_data("collectedItems", len(session.items))
+        for writer in self._all_writers():
+            writer._append_delta({"state": {"collectedItems": len(session.items)}})
 
     @pytest.hookimpl(trylast=True)
     def pytest_runtest_logreport(self, report):
@@ -280,6 +589,13 @@ class BaseReport:
                 DeprecationWarning,
             )
 
+        if report.when != "call" and report.outcome == "passed":
+            # passed "setup" and "teardown" are not added to the html,
+            # only the teardown logging is added to "call"
+            if report.when == "teardown":
+                self._report.update_test_log(report)
+            return
+
         data = {
             "duration": report.duration,
         }
@@ -290,23 +606,89 @@ class BaseReport:
         data["testId"] = test_id
 
         row_cells = Row()
-        self._config.hook.pytest_html_results_table_row(report=report, cells=row_cells)
+        with self._profiler.measure("table row hook"):
+            self._config.hook.pytest_html_results_table_row(
+                report=report, cells=row_cells
+            )
         if row_cells.html is None:
             return
         data["resultsTableRow"] = row_cells.html
+        if row_cells.values:
+            data["resultsTableValues"] = row_cells.values
 
         table_html = Html()
-        self._config.hook.pytest_html_results_table_html(report=report, data=table_html)
+        with self._profiler.measure("table html hook"):
+            self._config.hook.pytest_html_results_table_html(
+                report=report, data=table_html
+            )
         data["tableHtml"] = table_html.html["html"]
 
         data["result"] = _process_outcome(report)
-        data["extras"] = self._process_extras(report, test_id)
+        with self._profiler.measure("extras"):
+            data["extras"] = self._process_extras(report, test_id)
+            writer_extras = [
+                (writer, writer._process_extras(report, test_id))
+                for writer in self._writers
+            ]
 
         if self._report.add_test(data, report, row_cells, table_html.replace_log):
-            self._generate_report()
+            for writer, encoded in writer_extras:
+                writer._writer_extras[id(data)] = encoded
+            for writer in self._all_writers():
+                writer._add_to_page(report.nodeid, data["result"])
+                writer._generate_report(nodeid=report.nodeid)
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_runtest_logfinish(self, nodeid):
+        # all phases have been reported, including teardown logs
+        for writer in self._all_writers():
+            writer._append_test_delta(nodeid)
+
+
+class _Page:
+    """A page of the results, see --html-split and --html-failures-first."""
+
+    def __init__(self, name, path, results=None):
+        self.name = name
+        self.path = path
+        # the node IDs of the page's tests, in order
+        self.nodeids = {}
+        # the number of results per outcome
+        self.counts = defaultdict(int)
+        # the outcomes on the page, all of them by default
+        self.results = results
+
+    def includes(self, test):
+        return self.results is None or test["result"] in self.results
+
+
+def _select_logs(tests, logs):
+    # Returns the tests referencing a log table of only their own logs
+    log_ids = {}
+
+    def select(test):
+        if "log" not in test:
+            return test
+        return {**test, "log": log_ids.setdefault(test["log"], len(log_ids))}
+
+    tests = {
+        nodeid: [select(test) for test in results] for nodeid, results in tests.items()
+    }
+    return tests, [logs[log_id] for log_id in log_ids]
 
 
 def _process_css(default_css, extra_css):
+    # The stylesheet is rebuilt only when one of its sources has changed
+    sources = []
+    for path in [default_css, *extra_css]:
+        stat = os.stat(path)
+        sources.append((path, stat.st_mtime_ns, stat.st_size))
+    return _combine_css(tuple(sources))
+
+
+@lru_cache()
+def _combine_css(sources):
+    default_css, *extra_css = [path for path, _, _ in sources]
     with open(default_css, encoding="utf-8") as f:
         css = f.read()
 
@@ -320,18 +702,43 @@ def _process_css(default_css, extra_css):
             css += f.read()
 
     # ANSI support
-    if _ansi_styles:
+    ansi_styles = _ansi_styles()
+    if ansi_styles:
         ansi_css = [
             "\n/******************************",
             " * ANSI2HTML STYLES",
             " ******************************/\n",
         ]
-        ansi_css.extend([str(r) for r in _ansi_styles])
+        ansi_css.extend([str(r) for r in ansi_styles])
         css += "\n".join(ansi_css)
 
     return css
 
 
+@lru_cache()
+def _ansi_converter():
+    ansi = ansi_support()
+    if ansi:
+        converter = ansi.Ansi2HTMLConverter(inline=False, escaped=False)
+        return partial(converter.convert, full=False)
+
+    from _pytest.logging import _remove_ansi_escape_sequences
+
+    return _remove_ansi_escape_sequences
+
+
+def _handle_ansi(log):
+    return _ansi_converter()(log)
+
+
+def _ansi_styles():
+    if ansi_support():
+        from ansi2html import style
+
+        return style.get_styles()
+    return []
+
+
 def _is_error(report):
     return report.when in ["setup", "teardown"] and report.outcome == "failed"
 
@@ -355,6 +762,10 @@ def _process_logs(report):
     return "\n".join(log)
 
 
+def _log_key(log):
+    return hashlib.sha1(log.encode("utf-8")).digest()
+
+
 def _process_outcome(report):
     if _is_error(report):
         return "Error"
@@ -367,11 +778,44 @@ def _process_outcome(report):
     return report.outcome.capitalize()
 
 
-def _read_template(search_paths, template_name="index.jinja2"):
-    env = Environment(
+def _escape_script_data(data):
+    # The JSON is embedded in a <script> element, which only needs to be
+    # protected from closing the element or starting an HTML comment.
+    return data.replace("</", "<\\/").replace("<!--", "\\u003c!--")
+
+
+def _compile_redact_list(patterns):
+    compiled = [re.compile(pattern) for pattern in patterns]
+    if not compiled:
+        return lambda key: False
+    default_flags = re.compile("").flags
+    if any(regex.groups or regex.flags != default_flags for regex in compiled):
+        # group references and global flags only work in their own pattern
+        return lambda key: any(regex.match(key) for regex in compiled)
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns)).match
+
+
+def _template_cache_dir(config):
+    # not available when the cacheprovider plugin is disabled
+    cache = getattr(config, "cache", None)
+    return cache.mkdir("pytest-html") if cache else None
+
+
+@lru_cache()
+def _template_environment(search_paths):
+    return Environment(
         loader=FileSystemLoader(search_paths),
         autoescape=select_autoescape(
             enabled_extensions=("jinja2",),
         ),
     )
+
+
+def _read_template(search_paths, template_name="index.jinja2", cache_dir=None):
+    # The compiled templates are kept by the environment for the process, e.g.
+    # for pytester runs, and in the pytest cache for the next sessions. Changed
+    # sources are recompiled, the cache is keyed on their checksum.
+    env = _template_environment(search_paths)
+    # only used when a template is compiled, the first time in the process
+    env.bytecode_cache = FileSystemBytecodeCache(cache_dir) if cache_dir else None
     return env.get_template(template_name)
@@ -1,14 +1,21 @@
 # This Source Code Form is subject to the terms of the Mozilla Public
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
+import argparse
 import warnings
 from pathlib import Path
 
 import pytest
 
-from pytest_html.basereport import BaseReport as HTMLReport  # noqa: F401
-from pytest_html.report import Report
-from pytest_html.selfcontained_report import SelfContainedReport
+
+def __getattr__(name):
+    # The report classes, and with them Jinja2 and ansi2html, are only
+    # imported once a report is created, see pytest_configure.
+    if name == "HTMLReport":
+        from pytest_html.basereport import BaseReport
+
+        return BaseReport
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def pytest_addhooks(pluginmanager):
@@ -36,6 +43,48 @@ def pytest_addoption(parser):
         "restrictions are in place (see "
         "https://developer.mozilla.org/docs/Web/Security/CSP)",
     )
+    group.addoption(
+        "--self-contained-html-path",
+        action="store",
+        metavar="path",
+        default=None,
+        help="also create a self-contained html report at given path, "
+        "from the same test run as the --html report (requires --html).",
+    )
+    group.addoption(
+        "--html-split",
+        action="store",
+        type=_html_split,
+        metavar="module|directory|N",
+        default=None,
+        help="split the results over pages of one test module, one directory "
+        "or N tests each, the html report linking to the pages.",
+    )
+    group.addoption(
+        "--html-failures-first",
+        action="store_true",
+        help="at the end of the session, write a report of only the failures "
+        "and errors before the full html report, next to it.",
+    )
+    group.addoption(
+        "--html-live-updates",
+        action="store_true",
+        help="update an open html report while tests are running, from files "
+        "written next to it that are truncated at the end of the session.",
+    )
+    group.addoption(
+        "--html-assets-dir",
+        action="store",
+        metavar="path",
+        default=None,
+        help="write the report's script and styles to a versioned directory "
+        "in path, to be shared by multiple reports.",
+    )
+    group.addoption(
+        "--html-profile",
+        action="store_true",
+        help="show the time spent generating the html report, per phase.",
+    )
     group.addoption(
         "--css",
         action="append",
@@ -55,6 +104,13 @@ def pytest_addoption(parser):
         help="set the maximum filename length for assets "
         "attached to the html report.",
     )
+    parser.addini(
+        "columnar_report_data",
+        type="bool",
+        default=False,
+        help="Store the report's test data as one array per field with a shared "
+        "string table. Smaller and faster to load for very large reports",
+    )
     parser.addini(
         "environment_table_redact_list",
         type="linelist",
@@ -63,8 +119,24 @@ def pytest_addoption(parser):
     )
 
 
+def _html_split(value):
+    if value in ["module", "directory"]:
+        return value
+    try:
+        size = int(value)
+    except ValueError:
+        size = 0
+    if size < 1:
+        raise argparse.ArgumentTypeError(
+            f"expected 'module', 'directory' or a positive number, got {value!r}"
+        )
+    return size
+
+
 def pytest_configure(config):
     html_path = config.getoption("htmlpath")
+    if config.getoption("self_contained_html_path") and not html_path:
+        raise pytest.UsageError("--self-contained-html-path requires --html")
     if html_path:
         missing_css_files = []
         for css_path in config.getoption("css"):
@@ -81,10 +153,20 @@ def pytest_configure(config):
         if not hasattr(config, "workerinput"):
             # prevent opening html_path on worker nodes (xdist)
             if config.getoption("self_contained_html"):
+                from pytest_html.selfcontained_report import SelfContainedReport
+
                 html = SelfContainedReport(html_path, config)
             else:
+                from pytest_html.report import Report
+
                 html = Report(html_path, config)
 
+            self_contained_path = config.getoption("self_contained_html_path")
+            if self_contained_path:
+                from pytest_html.selfcontained_report import SelfContainedReport
+
+                html.add_writer(SelfContainedReport, self_contained_path)
+
             config.pluginmanager.register(html)
 
 
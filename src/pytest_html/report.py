@@ -1,23 +1,58 @@
 import base64
 import binascii
+import hashlib
+import os
 from pathlib import Path
 
+from pytest_html import __version__
 from pytest_html.basereport import BaseReport
+from pytest_html.util import write_if_changed
+
+# Browsers do not start a Web Worker from the file:// URL of the script, but
+# from the source of this function, see backend.js
+SCRIPT_TEMPLATE = b"function pytestHtmlApp() {\n%s\n}\npytestHtmlApp()\n"
 
 
 class Report(BaseReport):
-    def __init__(self, report_path, config):
-        super().__init__(report_path, config)
+    def __init__(self, report_path, config, **kwargs):
+        super().__init__(report_path, config, **kwargs)
         self._assets_path = Path(self._report_path.parent, "assets")
         self._assets_path.mkdir(parents=True, exist_ok=True)
-        self._css_path = Path(self._assets_path, "style.css")
 
-        with self._css_path.open("w", encoding="utf-8") as f:
-            f.write(self._css)
+        shared_assets_path = config.getoption("html_assets_dir")
+        if shared_assets_path:
+            # Shared by many reports, so the styles (which include any --css
+            # files) are named after their content.
+            static_path = Path(
+                os.path.expandvars(shared_assets_path), f"pytest-html-{__version__}"
+            ).expanduser()
+            digest = hashlib.sha1(self._css.encode("utf-8")).hexdigest()[:12]
+            css_name = f"style-{digest}.css"
+        else:
+            static_path = self._assets_path
+            css_name = "style.css"
+        static_path.mkdir(parents=True, exist_ok=True)
+
+        self._css_path = Path(static_path, css_name)
+        write_if_changed(self._css_path, self._css)
+        self._script_path = Path(static_path, "app.js")
+        script = Path(self._resources_path, "app.js").read_bytes()
+        write_if_changed(self._script_path, SCRIPT_TEMPLATE % script)
 
     @property
     def css(self):
-        return Path(self._assets_path.name, "style.css")
+        return self._url(self._css_path)
+
+    @property
+    def script(self):
+        return self._url(self._script_path)
+
+    def _url(self, path):
+        try:
+            return Path(os.path.relpath(path, self._report_path.parent)).as_posix()
+        except ValueError:
+            # e.g. on another drive on Windows
+            return path.resolve().as_uri()
 
     def _data_content(self, content, asset_name, *args, **kwargs):
         content = content.encode("utf-8")
@@ -33,5 +68,5 @@ class Report(BaseReport):
 
     def _write_content(self, content, asset_name):
         content_relative_path = Path(self._assets_path, asset_name)
-        content_relative_path.write_bytes(content)
+        write_if_changed(content_relative_path, content)
         return str(content_relative_path.relative_to(self._report_path.parent))
@@ -0,0 +1,135 @@
+const { manager } = require('./datamanager.js')
+const { applyFilter, doInitFilter, filterTests } = require('./filter.js')
+const { applySort, doInitSort } = require('./sort.js')
+
+// Actions are run wherever the full report data lives: in the Web Worker
+// when one could be started, otherwise on the main thread.
+const actions = {
+    load: ({ payload, href, visible, search, sort, ascending }) => {
+        manager.setManager(JSON.parse(payload), href)
+        doInitFilter(visible, search)
+        doInitSort(sort, ascending)
+    },
+    filter: ({ visible, search }) => applyFilter(visible, search),
+    sort: ({ sort, ascending }) => applySort(sort, ascending),
+    toggle: ({ id }) => manager.toggleCollapsedItem(id),
+    collapse: ({ collapsed }) => {
+        manager.allCollapsed = collapsed
+    },
+    append: ({ records, visible, search }) => {
+        // Returns the new tests to render, and the known tests that were replaced
+        const changes = records.map((record) => manager.applyDelta(record))
+        const rows = filterTests(changes.flatMap(({ added }) => added), visible, search)
+        manager.appendRender(rows)
+        return { rows, replaced: changes.flatMap(({ replaced }) => replaced) }
+    },
+}
+
+// Actions whose result (the rows to render) is sent back to the main thread
+const queries = ['load', 'filter', 'sort', 'append']
+
+const getView = (rows) => {
+    const { tests, ...data } = manager.renderData
+    return { data, tests: rows || tests, summary: manager.summary }
+}
+
+const listen = (scope) => {
+    scope.addEventListener('message', ({ data: message }) => {
+        const result = actions[message.action](message)
+        if (queries.includes(message.action)) {
+            const { rows, replaced } = message.action === 'append' ? result : {}
+            scope.postMessage({ requestId: message.requestId, action: message.action, replaced, ...getView(rows) })
+        }
+    })
+}
+
+const inlineBackend = {
+    request: (action, params) => Promise.resolve(actions[action](params)),
+    // the main thread already applied the change to the shared manager
+    notify: () => Promise.resolve(),
+}
+
+// The worker runs the report's script: from its source when it is included in
+// the report, or from its URL when it is loaded from a file (see
+// Report.script). Browsers do not allow the latter for file:// pages, which
+// start it from the source of the function the script is written in instead.
+const getWorkerScript = ({ src, textContent }, protocol, app) => {
+    if (!src) {
+        return { source: textContent }
+    }
+    if (protocol !== 'file:') {
+        return { url: src }
+    }
+    return app ? { source: `(${app})()` } : null
+}
+
+const spawnWorker = ({ source, url }) => {
+    try {
+        return new Worker(url || URL.createObjectURL(new Blob([source], { type: 'text/javascript' })))
+    } catch (error) {
+        // e.g. blocked by a Content Security Policy
+        return null
+    }
+}
+
+const createWorkerBackend = (worker) => {
+    const pending = new Map()
+    let requestId = 0
+    let loadMessage = null
+
+    const fallback = () => {
+        worker.terminate()
+        backend = inlineBackend
+        if (loadMessage && !pending.has(loadMessage.requestId)) {
+            actions.load(loadMessage)
+        }
+        pending.forEach(({ message, resolve }) => backend.request(message.action, message).then(resolve))
+        pending.clear()
+    }
+
+    worker.addEventListener('message', ({ data: view }) => {
+        const { resolve } = pending.get(view.requestId)
+        pending.delete(view.requestId)
+        if (view.action === 'append') {
+            manager.appendRemoteData(view)
+            resolve({ rows: view.tests, replaced: view.replaced })
+        } else {
+            manager.setRemoteData(view)
+            resolve(view.tests)
+        }
+    })
+    worker.addEventListener('error', (event) => {
+        event.preventDefault()
+        fallback()
+    })
+
+    return {
+        request: (action, params) => new Promise((resolve) => {
+            const message = { ...params, action, requestId: ++requestId }
+            if (action === 'load') {
+                loadMessage = message
+            }
+            pending.set(message.requestId, { message, resolve })
+            worker.postMessage(message)
+        }),
+        notify: (action, params) => {
+            worker.postMessage({ ...params, action })
+            return Promise.resolve()
+        },
+    }
+}
+
+let backend = inlineBackend
+
+const connect = (script) => {
+    const worker = script && typeof Worker !== 'undefined' ? spawnWorker(script) : null
+    backend = worker ? createWorkerBackend(worker) : inlineBackend
+}
+
+module.exports = {
+    connect,
+    getWorkerScript,
+    listen,
+    request: (action, params) => backend.request(action, params),
+    notify: (action, params) => backend.notify(action, params),
+}
@@ -1,22 +1,158 @@
 const { getCollapsedCategory } = require('./storage.js')
 
+const summarize = (tests) => tests.reduce((summary, { result, duration }) => {
+    const resultLower = result.toLowerCase()
+    summary.counts[resultLower] = (summary.counts[resultLower] || 0) + 1
+    if (['passed', 'failed', 'xpassed', 'xfailed'].includes(resultLower)) {
+        summary.numberOfTests += 1
+    }
+    summary.duration += duration || 0
+    return summary
+}, { counts: {}, numberOfTests: 0, duration: 0 })
+
+// IDs are stored as [prefix index, name], see util.split_node_id
+const decodeId = (prefixes, [prefix, name]) => prefixes[prefix] + name
+
+// Decodes tests stored with relative IDs, see util.encode_rows
+const decodeRows = ({ prefixes, tests }) => Object.fromEntries(tests.map(([nodeid, results]) => {
+    results.forEach((test) => {
+        if (Array.isArray(test.testId)) {
+            test.testId = decodeId(prefixes, test.testId)
+        }
+    })
+    return [decodeId(prefixes, nodeid), results]
+}))
+
+// Decodes tests stored as one array per field, see util.encode_columnar
+const decodeColumnar = ({ prefixes, strings, columns }) => {
+    const parsed = new Map()
+    const decoders = {
+        string: (ref) => strings[ref],
+        value: (value) => value,
+        json: (ref) => {
+            if (!parsed.has(ref)) {
+                parsed.set(ref, JSON.parse(strings[ref]))
+            }
+            return parsed.get(ref)
+        },
+        id: ([prefix, ref]) => prefixes[prefix] + strings[ref],
+    }
+    const { nodeid, ...fields } = columns
+    const fieldEntries = Object.entries(fields)
+    const tests = {}
+    nodeid.values.forEach((nodeidRef, index) => {
+        const test = {}
+        fieldEntries.forEach(([field, { type, values }]) => {
+            if (values[index] !== null) {
+                test[field] = decoders[type](values[index])
+            }
+        })
+        const name = decoders[nodeid.type](nodeidRef)
+        tests[name] = tests[name] || []
+        tests[name].push(test)
+    })
+    return tests
+}
+
+const layouts = {
+    rows: decodeRows,
+    columnar: decodeColumnar,
+}
+
+const decodeTests = (tests) => layouts[tests.layout] ? layouts[tests.layout](tests) : tests
+
+// Logs are stored once in a table and referenced by their index
+const resolveLog = (test, logs) => typeof test.log === 'number' ? { ...test, log: logs[test.log] } : test
+
+const replaceById = (tests, replacement) => tests.map((test) => test.id === replacement.id ? replacement : test)
+
+// Identifies a test across live updates: its node ID and index among the node's results
+const getTestKey = (nodeid, index) => `${index}|${nodeid}`
+
 class DataManager {
-    setManager(data) {
-        const collapsedCategories = [...getCollapsedCategory(data.collapsed)]
-        const dataBlob = { ...data, tests: Object.values(data.tests).flat().map((test, index) => ({
+    setManager(data, href) {
+        this.collapsedCategories = [...getCollapsedCategory(data.collapsed, href)]
+        // the position of each test in this.data.tests, by key
+        this.testKeys = new Map()
+        const { logs, ...reportData } = data
+        // kept for the live updates, which reference the same log table
+        this.logs = logs || []
+        const tests = Object.entries(decodeTests(data.tests)).flatMap(([nodeid, results]) =>
+            [].concat(results).map((test, index) => {
+                this.testKeys.set(getTestKey(nodeid, index), this.testKeys.size)
+                return resolveLog(test, this.logs)
+            }))
+        const dataBlob = { ...reportData, tests: tests.map((test, index) => this.prepareTest(test, index)) }
+        this.data = { ...dataBlob }
+        this.renderData = { ...dataBlob, tests: [...dataBlob.tests] }
+        this._summary = null
+    }
+    setRemoteData({ data, tests, summary }) {
+        // Only the rows to render are known when the data lives in a worker
+        this.data = { ...data, tests }
+        this.renderData = { ...data, tests: [...tests] }
+        this._summary = summary
+    }
+    prepareTest(test, index) {
+        return {
             ...test,
             id: `test_${index}`,
-            collapsed: collapsedCategories.includes(test.result.toLowerCase()),
-        })) }
-        this.data = { ...dataBlob }
-        this.renderData = { ...dataBlob }
+            collapsed: this.collapsedCategories.includes(test.result.toLowerCase()),
+        }
+    }
+    applyDelta({ nodeid, start, tests, logs, state }) {
+        // Returns the tests that were not known yet, and the known tests replaced
+        Object.assign(this.data, state)
+        Object.assign(this.renderData, state)
+        Object.entries(logs || {}).forEach(([logId, log]) => {
+            this.logs[logId] = log
+        })
+        const added = []
+        const replaced = []
+        ;(tests || []).map((test) => resolveLog(test, this.logs)).forEach((test, index) => {
+            const key = getTestKey(nodeid, start + index)
+            if (this.testKeys.has(key)) {
+                // e.g. with the teardown output, the report was written before the teardown
+                replaced.push(this.replaceTest(this.testKeys.get(key), test))
+            } else {
+                const position = this.data.tests.length + added.length
+                this.testKeys.set(key, position)
+                added.push(this.prepareTest(test, position))
+            }
+        })
+        this.data.tests.push(...added)
+        this._summary = null
+        return { added, replaced }
+    }
+    replaceTest(position, test) {
+        const { collapsed } = this.renderData.tests.find(({ id }) => id === this.data.tests[position].id) ||
+            this.data.tests[position]
+        const replacement = { ...this.prepareTest(test, position), collapsed }
+        // a new array, so that the sort and search caches are rebuilt
+        this.data.tests = this.data.tests.map((known, index) => index === position ? replacement : known)
+        this.renderData.tests = replaceById(this.renderData.tests, replacement)
+        return replacement
+    }
+    appendRender(tests) {
+        this.renderData.tests.push(...tests)
+    }
+    appendRemoteData({ data, tests, replaced, summary }) {
+        Object.assign(this.data, data)
+        Object.assign(this.renderData, data)
+        this.data.tests.push(...tests)
+        this.renderData.tests.push(...tests)
+        replaced.forEach((test) => {
+            this.data.tests = replaceById(this.data.tests, test)
+            this.renderData.tests = replaceById(this.renderData.tests, test)
+        })
+        this._summary = summary
     }
 
     get allData() {
         return { ...this.data }
     }
     resetRender() {
-        this.renderData = { ...this.data }
+        this.renderData = { ...this.data, tests: [...this.data.tests] }
     }
     setRender(data) {
         this.renderData.tests = [...data]
@@ -38,6 +174,12 @@ class DataManager {
     get allTests() {
         return [...this.data.tests]
     }
+    get summary() {
+        if (!this._summary) {
+            this._summary = summarize(this.data.tests)
+        }
+        return this._summary
+    }
     get title() {
         return this.renderData.title
     }
@@ -53,5 +195,6 @@ class DataManager {
 }
 
 module.exports = {
+    decodeTests,
     manager: new DataManager(),
 }
@@ -34,6 +34,15 @@ const insertAdditionalHTML = (html, element, selector, position = 'beforebegin')
     })
 }
 
+// Inserts the cells of the columns declared with table.Header.add_column
+const insertColumns = (row, columns, createCell) => {
+    columns?.forEach(({ index, ...column }) => {
+        const cell = createCell(column)
+        const next = index === null ? null : row.children[index]
+        row.insertBefore(cell, next || null)
+    })
+}
+
 const dom = {
     getStaticRow: (key, value) => {
         const envRow = templateEnvRow.content.cloneNode(true)
@@ -48,22 +57,13 @@ const dom = {
 
         return envRow
     },
-    getListHeader: ({ resultsTableHeader }) => {
+    getListHeader: ({ resultsTableHeader, resultsTableSortables }) => {
         const header = listHeader.content.cloneNode(true)
         const sortAttr = storageModule.getSort()
         const sortAsc = JSON.parse(storageModule.getSortDirection())
 
-        const regex = /data-column-type="(\w+)/
-        const cols = Object.values(resultsTableHeader).reduce((result, value) => {
-            if (value.includes("sortable")) {
-                const matches = regex.exec(value)
-                if (matches) {
-                    result.push(matches[1])
-                }
-            }
-            return result
-        }, [])
-        const sortables = ['result', 'testId', 'duration', ...cols]
+        // sortable columns are collected by table.Header
+        const sortables = ['result', 'testId', 'duration', ...(resultsTableSortables || [])]
 
         // Add custom html from the pytest_html_results_table_header hook
         const headers = transformTableObj(resultsTableHeader)
@@ -72,12 +72,31 @@ const dom = {
 
         sortables.forEach((sortCol) => {
             if (sortCol === sortAttr) {
-                header.querySelector(`[data-column-type="${sortCol}"]`).classList.add(sortAsc ? 'desc' : 'asc')
+                // columns added with table.Header.add_column are marked when they are inserted
+                header.querySelector(`[data-column-type="${sortCol}"]`)?.classList.add(sortAsc ? 'desc' : 'asc')
             }
         })
 
         return header
     },
+    insertHeaderColumns: (row, columns) => insertColumns(row, columns, ({ column, title, sortable }) => {
+        const cell = document.createElement('th')
+        cell.textContent = title
+        cell.dataset.columnType = column
+        if (sortable) {
+            cell.classList.add('sortable', column)
+            if (column === storageModule.getSort()) {
+                cell.classList.add(JSON.parse(storageModule.getSortDirection()) ? 'desc' : 'asc')
+            }
+        }
+        return cell
+    }),
+    insertRowColumns: (row, columns, values) => insertColumns(row, columns, ({ column }) => {
+        const cell = document.createElement('td')
+        cell.className = `col-${column}`
+        cell.textContent = values?.[column] ?? ''
+        return cell
+    }),
     getListHeaderEmpty: () => listHeaderEmpty.content.cloneNode(true),
     getColGroup: () => templateCollGroup.content.cloneNode(true),
     getResultTBody: ({ testId, id, log, duration, extras, resultsTableRow, tableHtml, result, collapsed }) => {
@@ -1,33 +1,46 @@
 const { manager } = require('./datamanager.js')
 const storageModule = require('./storage.js')
+const { searchTests } = require('./search.js')
 
-const getFilteredSubSet = (filter) =>
-    manager.allData.tests.filter(({ result }) => filter.includes(result.toLowerCase()))
+const filterTests = (tests, filter, search) => {
+    const matches = searchTests(search)
+    return tests.filter(({ id, result }) =>
+        filter.includes(result.toLowerCase()) && (!matches || matches.has(id)))
+}
+
+const getFilteredSubSet = (filter, search) => filterTests(manager.allData.tests, filter, search)
 
-const doInitFilter = () => {
-    const currentFilter = storageModule.getVisible()
-    const filteredSubset = getFilteredSubSet(currentFilter)
+const doInitFilter = (currentFilter = storageModule.getVisible(), search) => {
+    const filteredSubset = getFilteredSubSet(currentFilter, search)
     manager.setRender(filteredSubset)
 }
 
-const doFilter = (type, show) => {
+const applyFilter = (currentFilter, search) => {
+    if (currentFilter.length) {
+        const filteredSubset = getFilteredSubSet(currentFilter, search)
+        manager.setRender(filteredSubset)
+    } else {
+        manager.resetRender()
+    }
+}
+
+const updateFilter = (type, show) => {
     if (show) {
         storageModule.showCategory(type)
     } else {
         storageModule.hideCategory(type)
     }
+    return storageModule.getVisible()
+}
 
-    const currentFilter = storageModule.getVisible()
-
-    if (currentFilter.length) {
-        const filteredSubset = getFilteredSubSet(currentFilter)
-        manager.setRender(filteredSubset)
-    } else {
-        manager.resetRender()
-    }
+const doFilter = (type, show) => {
+    applyFilter(updateFilter(type, show))
 }
 
 module.exports = {
+    applyFilter,
+    filterTests,
     doFilter,
     doInitFilter,
+    updateFilter,
 }
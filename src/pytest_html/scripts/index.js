@@ -1,15 +1,50 @@
-const { redraw, bindEvents } = require('./main.js')
-const { doInitFilter } = require('./filter.js')
-const { doInitSort } = require('./sort.js')
-const { manager } = require('./datamanager.js')
-const data = JSON.parse(document.querySelector('#data-container').dataset.jsonblob)
+if (typeof document === 'undefined') {
+    // Running as the report's Web Worker, see backend.js
+    require('./backend.js').listen(self)
+} else {
+    const { appendRows, redraw, bindEvents } = require('./main.js')
+    const backend = require('./backend.js')
+    const { manager } = require('./datamanager.js')
+    const { startPolling } = require('./live.js')
+    const storageModule = require('./storage.js')
+    const workerScript = document.currentScript &&
+        backend.getWorkerScript(document.currentScript, window.location.protocol, window.pytestHtmlApp)
+    // Smaller reports are quicker to handle on the main thread
+    const workerPayloadSize = 1024 * 1024
 
-function init() {
-    manager.setManager(data)
-    doInitFilter()
-    doInitSort()
-    redraw()
-    bindEvents()
-}
+    const init = () => {
+        const payload = document.querySelector('#data-container').textContent
+        backend.connect(payload.length > workerPayloadSize ? workerScript : null)
+        backend.request('load', {
+            payload,
+            href: window.location.href,
+            visible: storageModule.getVisible(),
+            search: storageModule.getSearch(),
+            sort: storageModule.getSort(),
+            ascending: storageModule.getSortDirection(),
+        }).then(() => {
+            redraw()
+            bindEvents()
+            // the pages of a split report are not updated live
+            if (!manager.isFinished && manager.allData.deltaPrefix) {
+                startPolling(manager.allData, update)
+            }
+        })
+    }
+
+    const update = (records) => backend.request('append', {
+        records,
+        visible: storageModule.getVisible(),
+        search: storageModule.getSearch(),
+    }).then(({ rows, replaced }) => {
+        if (replaced.length) {
+            // rows already on the page have changed
+            redraw()
+        } else {
+            appendRows(rows)
+        }
+        return manager.isFinished
+    })
 
-init()
+    init()
+}
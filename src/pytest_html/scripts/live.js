@@ -0,0 +1,52 @@
+// Polls the live update files written by the plugin while tests are running.
+// Each file calls pytestHtmlDelta() for every record, see BaseReport._append_delta.
+const pollInterval = 2000
+
+const startPolling = ({ deltaPrefix, deltaChunkSize, deltaSequence }, onRecords) => {
+    let sequence = deltaSequence || 0
+    let received = []
+    window.pytestHtmlDelta = (record) => {
+        const latest = received.length ? received[received.length - 1].sequence : sequence
+        if (record.sequence > latest) {
+            received.push(record)
+        }
+    }
+
+    const poll = () => {
+        const chunk = Math.floor(sequence / deltaChunkSize)
+        const script = document.createElement('script')
+        script.src = `${deltaPrefix}.${chunk}.js?${Date.now()}`
+
+        const done = () => {
+            script.remove()
+            const records = received
+            received = []
+            if (!records.length) {
+                setTimeout(poll, pollInterval)
+                return
+            }
+            if (records.some(({ reload }) => reload)) {
+                // the session has finished and the report holds all results
+                window.location.reload()
+                return
+            }
+            sequence = records[records.length - 1].sequence
+            onRecords(records).then((finished) => {
+                if (finished) {
+                    return
+                }
+                // the rest of a full file might already be in the next one
+                const isChunkComplete = sequence % deltaChunkSize === 0
+                setTimeout(poll, isChunkComplete ? 0 : pollInterval)
+            })
+        }
+        script.addEventListener('load', done)
+        script.addEventListener('error', done)
+        document.head.appendChild(script)
+    }
+    setTimeout(poll, pollInterval)
+}
+
+module.exports = {
+    startPolling,
+}
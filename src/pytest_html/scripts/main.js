@@ -1,9 +1,12 @@
 const { formatDuration } = require('./utils.js')
 const { dom, findAll } = require('./dom.js')
 const { manager } = require('./datamanager.js')
-const { doSort } = require('./sort.js')
-const { doFilter } = require('./filter.js')
-const { getVisible, possibleResults } = require('./storage.js')
+const backend = require('./backend.js')
+const mediaViewer = require('./mediaviewer.js')
+const { renderInChunks } = require('./render.js')
+const { updateSort } = require('./sort.js')
+const { updateFilter } = require('./filter.js')
+const { getSearch, getVisible, possibleResults, setSearch } = require('./storage.js')
 
 const removeChildren = (node) => {
     while (node.firstChild) {
@@ -28,55 +31,90 @@ const renderStatic = () => {
     renderTable()
 }
 
+// Time (ms) to wait for further typing before searching
+const searchDelay = 150
+
+const renderRow = (test, headerPops, columnCount) => {
+    const row = dom.getResultTBody(test)
+    if (headerPops > 0) {
+        // remove 'headerPops' number of row columns
+        findAll('td:not(.extra)', row).splice(-headerPops).forEach((column) => column.remove())
+    }
+    dom.insertRowColumns(row.querySelector('tr'), manager.renderData.resultsTableColumns, test.resultsTableValues)
+    row.querySelector('.extra').colSpan = columnCount
+    const resultBody = row.querySelector('tbody')
+    row.querySelector('.col-result').addEventListener('click', ({ target }) => {
+        manager.toggleCollapsedItem(target.dataset.id)
+        backend.notify('toggle', { id: target.dataset.id })
+        // only this row changes, so it is updated in place
+        const collapsed = target.classList.contains('collapser')
+        target.classList.toggle('collapser', !collapsed)
+        target.classList.toggle('expander', collapsed)
+        resultBody.querySelector('.extras-row').classList.toggle('hidden', collapsed)
+        if (collapsed) {
+            mediaViewer.release(resultBody)
+        }
+    })
+    return row
+}
+
 const renderContent = (tests) => {
-    const rows = tests.map(dom.getResultTBody)
     const table = document.querySelector('#results-table')
     removeChildren(table)
     const tableHeader = dom.getListHeader(manager.renderData)
-    if (!rows.length) {
+    if (!tests.length) {
         tableHeader.appendChild(dom.getListHeaderEmpty())
     }
     table.appendChild(dom.getColGroup())
     table.appendChild(tableHeader)
 
-    rows.forEach((row) => !!row && table.appendChild(row))
-
-    table.querySelectorAll('.extra').forEach((item) => {
-        item.colSpan = document.querySelectorAll('th').length
-    })
-
     const { headerPops } = manager.renderData
     if (headerPops > 0) {
         // remove 'headerPops' number of header columns
-        findAll('#results-table-head th').splice(-headerPops).forEach(column => column.remove())
-
-        // remove 'headerPops' number of row columns
-        const resultRows = findAll('.results-table-row')
-        resultRows.forEach((elem) => {
-            findAll('td:not(.extra)', elem).splice(-headerPops).forEach(column => column.remove())
-        })
+        findAll('#results-table-head th').splice(-headerPops).forEach((column) => column.remove())
     }
+    dom.insertHeaderColumns(document.querySelector('#results-table-head tr'), manager.renderData.resultsTableColumns)
+    const columnCount = findAll('#results-table-head th').length
 
     findAll('.sortable').forEach((elem) => {
         elem.addEventListener('click', (evt) => {
             const { target: element } = evt
             const { columnType } = element.dataset
-            doSort(columnType)
-            redraw()
+            const ascending = updateSort(columnType)
+            backend.request('sort', { sort: columnType, ascending }).then(redraw)
         })
     })
-    findAll('.col-result').forEach((elem) => {
-        elem.addEventListener('click', ({ target }) => {
-            manager.toggleCollapsedItem(target.dataset.id)
-            redraw()
-        })
+
+    // Reserve each row's position so rows can be rendered in any order
+    const placeholders = tests.map(() => document.createElement('tbody'))
+    const fragment = document.createDocumentFragment()
+    placeholders.forEach((placeholder) => fragment.appendChild(placeholder))
+    table.appendChild(fragment)
+
+    renderInChunks(tests, (index) => {
+        placeholders[index].replaceWith(renderRow(tests[index], headerPops, columnCount))
     })
 }
 
-const renderDerived = (tests, collectedItems, isFinished) => {
+const appendRows = (tests) => {
+    const table = document.querySelector('#results-table')
+    if (tests.length && !table.querySelector('tbody')) {
+        // replace the "No results found" message
+        redraw()
+        return
+    }
+    const { headerPops } = manager.renderData
+    const columnCount = findAll('#results-table-head th').length
+    tests.forEach((test) => table.appendChild(renderRow(test, headerPops, columnCount)))
+
+    const { summary, collectedItems, isFinished } = manager
+    renderDerived(summary, collectedItems, isFinished)
+}
+
+const renderDerived = ({ counts, numberOfTests, duration }, collectedItems, isFinished) => {
     const currentFilter = getVisible()
     possibleResults.forEach(({ result, label }) => {
-        const count = tests.filter((test) => test.result.toLowerCase() === result).length
+        const count = counts[result] || 0
         const input = document.querySelector(`input[data-test-result="${result}"]`)
         const lastInput = document.querySelector(`input[data-test-result="${result}"]:last-of-type`)
         document.querySelector(`.${result}`).innerText = `${count} ${label}`
@@ -89,12 +127,8 @@ const renderDerived = (tests, collectedItems, isFinished) => {
         input.checked = currentFilter.includes(result)
     })
 
-    const numberOfTests = tests.filter(({ result }) =>
-        ['Passed', 'Failed', 'XPassed', 'XFailed'].includes(result)).length
-
     if (isFinished) {
-        const accTime = tests.reduce((prev, { duration }) => prev + duration, 0)
-        const formattedAccTime = formatDuration(accTime)
+        const formattedAccTime = formatDuration(duration)
         const testWord = numberOfTests > 1 ? 'tests' : 'test'
         const durationText = formattedAccTime.hasOwnProperty('ms') ? formattedAccTime.ms : formattedAccTime.formatted
 
@@ -110,30 +144,50 @@ const bindEvents = () => {
         const { target: element } = evt
         const { testResult } = element.dataset
 
-        doFilter(testResult, element.checked)
-        redraw()
+        const visible = updateFilter(testResult, element.checked)
+        backend.request('filter', { visible, search: getSearch() }).then(redraw)
     }
     findAll('input[name="filter_checkbox"]').forEach((elem) => {
         elem.removeEventListener('click', filterColumn)
         elem.addEventListener('click', filterColumn)
     })
+
+    const searchInput = document.querySelector('#search')
+    const searchLogs = document.querySelector('#search-logs')
+    const { query, logs } = getSearch()
+    searchInput.value = query
+    searchLogs.checked = logs
+    let searchTimeout
+    const search = () => {
+        clearTimeout(searchTimeout)
+        searchTimeout = setTimeout(() => {
+            setSearch({ query: searchInput.value, logs: searchLogs.checked })
+            backend.request('filter', { visible: getVisible(), search: getSearch() }).then(redraw)
+        }, searchDelay)
+    }
+    searchInput.addEventListener('input', search)
+    searchLogs.addEventListener('change', search)
+
     document.querySelector('#show_all_details').addEventListener('click', () => {
         manager.allCollapsed = false
+        backend.notify('collapse', { collapsed: false })
         redraw()
     })
     document.querySelector('#hide_all_details').addEventListener('click', () => {
         manager.allCollapsed = true
+        backend.notify('collapse', { collapsed: true })
         redraw()
     })
 }
 
 const redraw = () => {
-    const { testSubset, allTests, collectedItems, isFinished } = manager
+    const { testSubset, summary, collectedItems, isFinished } = manager
 
     renderStatic()
     renderContent(testSubset)
-    renderDerived(allTests, collectedItems, isFinished)
+    renderDerived(summary, collectedItems, isFinished)
 }
 
+exports.appendRows = appendRows
 exports.redraw = redraw
 exports.bindEvents = bindEvents
@@ -21,9 +21,27 @@ class MediaViewer {
 }
 
 
+// Media are only loaded once their row is expanded and scrolled into view:
+// the media of collapsed rows are not displayed, so never intersect.
+const loaders = new WeakMap()
+let observer = null
+
+const getObserver = () => {
+    if (!observer && typeof IntersectionObserver !== 'undefined') {
+        observer = new IntersectionObserver((entries) => entries.forEach(({ isIntersecting, target }) => {
+            if (isIntersecting) {
+                observer.unobserve(target)
+                loaders.get(target).load()
+            }
+        }), { rootMargin: '200px' })
+    }
+    return observer
+}
+
 const setUp = (resultBody, assets) => {
+    const mediaEl = resultBody.querySelector('.media')
     if (!assets.length) {
-        resultBody.querySelector('.media').classList.add('hidden')
+        mediaEl.classList.add('hidden')
         return
     }
 
@@ -35,16 +53,27 @@ const setUp = (resultBody, assets) => {
     const imageEl = resultBody.querySelector('img')
     const sourceEl = resultBody.querySelector('source')
     const videoEl = resultBody.querySelector('video')
+    imageEl.loading = 'lazy'
+    videoEl.preload = 'none'
+    let loaded = false
 
-    const setImg = (media, index) => {
+    const setSource = (media) => {
         if (media?.format_type === 'image') {
             imageEl.src = media.path
+        } else if (media?.format_type === 'video') {
+            sourceEl.src = media.path
+            videoEl.load()
+        }
+    }
 
+    const setImg = (media, index) => {
+        if (loaded) {
+            setSource(media)
+        }
+        if (media?.format_type === 'image') {
             imageEl.classList.remove('hidden')
             videoEl.classList.add('hidden')
         } else if (media?.format_type === 'video') {
-            sourceEl.src = media.path
-
             videoEl.classList.remove('hidden')
             imageEl.classList.add('hidden')
         }
@@ -54,6 +83,27 @@ const setUp = (resultBody, assets) => {
     }
     setImg(mediaViewer.activeFile, mediaViewer.currentIndex)
 
+    const load = () => {
+        loaded = true
+        setSource(mediaViewer.activeFile)
+    }
+    const release = () => {
+        // drops the decoded media, e.g. the data URIs of a self-contained report
+        loaded = false
+        imageEl.removeAttribute('src')
+        if (sourceEl.getAttribute('src')) {
+            sourceEl.removeAttribute('src')
+            videoEl.load()
+        }
+        getObserver()?.observe(mediaEl)
+    }
+    loaders.set(mediaEl, { load, release })
+    if (getObserver()) {
+        getObserver().observe(mediaEl)
+    } else {
+        load()
+    }
+
     const moveLeft = () => {
         const [media, index] = mediaViewer.prevActive()
         setImg(media, index)
@@ -71,4 +121,13 @@ const setUp = (resultBody, assets) => {
     imageEl.addEventListener('click', openImg)
 }
 
+// Called when the row of resultBody is collapsed
+const release = (resultBody) => {
+    const mediaEl = resultBody.querySelector('.media')
+    if (loaders.has(mediaEl)) {
+        loaders.get(mediaEl).release()
+    }
+}
+
 exports.setUp = setUp
+exports.release = release
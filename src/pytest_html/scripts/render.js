@@ -0,0 +1,54 @@
+// Rows with these results are rendered before all others
+const priorityResults = ['error', 'failed', 'xpassed']
+// Time (ms) spent rendering rows before yielding to the browser
+const firstChunkBudget = 100
+const chunkBudget = 12
+let renderGeneration = 0
+
+const scheduleChunk = (callback) => {
+    if (typeof requestIdleCallback === 'function') {
+        requestIdleCallback(callback, { timeout: 50 })
+    } else {
+        requestAnimationFrame(() => callback())
+    }
+}
+
+const getRenderOrder = (tests) => {
+    const priority = []
+    const others = []
+    tests.forEach(({ result }, index) => {
+        if (priorityResults.includes(result.toLowerCase())) {
+            priority.push(index)
+        } else {
+            others.push(index)
+        }
+    })
+    return [...priority, ...others]
+}
+
+// Calls render with the index of every test, in render order and in
+// time-sliced chunks. Chunks still pending from a previous call are dropped.
+const renderInChunks = (tests, render) => {
+    const order = getRenderOrder(tests)
+    const generation = ++renderGeneration
+    let position = 0
+    const renderChunk = (budget = chunkBudget) => {
+        if (generation !== renderGeneration) {
+            // a newer redraw has replaced this table
+            return
+        }
+        const start = performance.now()
+        while (position < order.length && performance.now() - start < budget) {
+            render(order[position++])
+        }
+        if (position < order.length) {
+            scheduleChunk(() => renderChunk())
+        }
+    }
+    renderChunk(firstChunkBudget)
+}
+
+module.exports = {
+    getRenderOrder,
+    renderInChunks,
+}
@@ -0,0 +1,124 @@
+const { manager } = require('./datamanager.js')
+
+const tokenize = (text) => {
+    const tokens = new Set()
+    String(text).toLowerCase().split(/[^\p{L}\p{N}_]+/u).forEach((word) => {
+        if (!word) {
+            return
+        }
+        tokens.add(word)
+        // also index the parts of snake_case names, e.g. "orders" in "test_orders"
+        word.split('_').forEach((part) => part && tokens.add(part))
+    })
+    return tokens
+}
+
+const stripTags = (html) => String(html).replace(/<[^>]*>/g, ' ')
+
+const getTestText = ({ testId, resultsTableRow, resultsTableValues }) => [
+    testId,
+    ...Object.values(resultsTableRow || {}).map(stripTags),
+    ...Object.values(resultsTableValues || {}),
+].join(' ')
+
+const getLogText = ({ log }) => log ? stripTags(log) : ''
+
+class SearchIndex {
+    constructor(getText) {
+        this.getText = getText
+        this.postings = new Map()
+        this.vocabulary = null
+        this.size = 0
+    }
+
+    add(tests) {
+        tests.forEach((test) => {
+            const position = this.size++
+            tokenize(this.getText(test)).forEach((token) => {
+                if (!this.postings.has(token)) {
+                    this.postings.set(token, [])
+                }
+                this.postings.get(token).push(position)
+            })
+        })
+        this.vocabulary = null
+    }
+
+    getPositions(term) {
+        if (!this.vocabulary) {
+            this.vocabulary = [...this.postings.keys()].sort()
+        }
+        // binary search for the first token starting with term
+        let low = 0
+        let high = this.vocabulary.length
+        while (low < high) {
+            const middle = (low + high) >>> 1
+            if (this.vocabulary[middle] < term) {
+                low = middle + 1
+            } else {
+                high = middle
+            }
+        }
+        const positions = new Set()
+        for (let i = low; i < this.vocabulary.length && this.vocabulary[i].startsWith(term); i++) {
+            this.postings.get(this.vocabulary[i]).forEach((position) => positions.add(position))
+        }
+        return positions
+    }
+}
+
+// Positions of the tests matching every term of the query in any of the indices
+const searchIndices = (selected, query) => [...tokenize(query)].reduce((matches, term) => {
+    const positions = new Set()
+    selected.forEach((index) => index.getPositions(term).forEach((position) => positions.add(position)))
+    return matches ? new Set([...matches].filter((position) => positions.has(position))) : positions
+}, null)
+
+// Indices are built on first use and kept in sync with the loaded tests
+const indices = {
+    tests: null,
+    testIds: null,
+    logs: null,
+}
+
+const getIndex = (name, getText) => {
+    const { tests } = manager.allData
+    if (indices.tests !== tests) {
+        // e.g. a test was replaced by a live update, see DataManager.replaceTest
+        indices.tests = tests
+        indices.testIds = null
+        indices.logs = null
+    }
+    if (!indices[name]) {
+        indices[name] = new SearchIndex(getText)
+    }
+    if (indices[name].size < tests.length) {
+        indices[name].add(tests.slice(indices[name].size))
+    }
+    return indices[name]
+}
+
+// Returns the ids of the tests matching the query, or null when there is
+// nothing to search for.
+const searchTests = (search) => {
+    const { query, logs } = search || {}
+    if (!query?.trim()) {
+        return null
+    }
+    const selected = [getIndex('testIds', getTestText)]
+    if (logs) {
+        selected.push(getIndex('logs', getLogText))
+    }
+    const positions = searchIndices(selected, query)
+    if (!positions) {
+        return null
+    }
+    const { tests } = manager.allData
+    return new Set([...positions].map((position) => tests[position].id))
+}
+
+module.exports = {
+    SearchIndex,
+    searchTests,
+    tokenize,
+}
@@ -1,32 +1,98 @@
 const { manager } = require('./datamanager.js')
 const storageModule = require('./storage.js')
 
-const genericSort = (list, key, ascending, customOrder) => {
-    let sorted
-    if (customOrder) {
-        sorted = list.sort((a, b) => {
-            const aValue = a.result.toLowerCase()
-            const bValue = b.result.toLowerCase()
+// Sorted orders are computed once per column/direction over the full data set
+// and reused for every subsequent sort of that column (or any subset of it).
+const sortCache = {
+    tests: null,
+    size: 0,
+    positions: new Map(),
+    orders: new Map(),
+}
 
-            const aIndex = customOrder.findIndex(item => item.toLowerCase() === aValue)
-            const bIndex = customOrder.findIndex(item => item.toLowerCase() === bValue)
+const getSortCache = () => {
+    const { tests } = manager.allData
+    // tests are appended to by live updates, and replaced in a new array
+    if (sortCache.tests !== tests || sortCache.size !== tests.length) {
+        sortCache.tests = tests
+        sortCache.size = tests.length
+        sortCache.positions = new Map(tests.map(({ id }, index) => [id, index]))
+        sortCache.orders = new Map()
+    }
+    return sortCache
+}
 
-            // Compare the indices to determine the sort order
-            return aIndex - bIndex
-        })
-    } else {
-        sorted = list.sort((a, b) => a[key] === b[key] ? 0 : a[key] > b[key] ? 1 : -1)
+const toSortKey = (value) => {
+    if (typeof value === 'number') {
+        return value
+    }
+    if (typeof value === 'string' && value.trim() !== '' && !isNaN(value)) {
+        return Number(value)
+    }
+    return value ?? ''
+}
+
+const compareSortKeys = (a, b) => {
+    const aIsNumber = typeof a === 'number'
+    const bIsNumber = typeof b === 'number'
+    if (aIsNumber !== bIsNumber) {
+        // numbers sort before anything else
+        return aIsNumber ? -1 : 1
     }
+    return a === b ? 0 : a > b ? 1 : -1
+}
 
+const getSortKeys = (list, key, customOrder) => {
+    if (customOrder) {
+        const ranks = new Map(customOrder.map((item, index) => [item.toLowerCase(), index]))
+        return list.map(({ result }) => ranks.get(result.toLowerCase()) ?? -1)
+    }
+    // values of the columns declared with table.Header.add_column are sorted on directly
+    return list.map((test) => toSortKey(test[key] ?? test.resultsTableValues?.[key]))
+}
+
+const getSortedIndices = (list, key, ascending, customOrder) => {
+    const keys = getSortKeys(list, key, customOrder)
+    const indices = keys.map((_, index) => index).sort((a, b) => compareSortKeys(keys[a], keys[b]))
     if (ascending) {
-        sorted.reverse()
+        indices.reverse()
+    }
+    return indices
+}
+
+const getCachedOrder = (cache, key, ascending, customOrder) => {
+    const cacheKey = `${customOrder ? `order:${customOrder.join(',')}` : `key:${key}`}:${!!ascending}`
+    if (!cache.orders.has(cacheKey)) {
+        const reverseKey = `${cacheKey.slice(0, cacheKey.lastIndexOf(':'))}:${!ascending}`
+        const order = cache.orders.has(reverseKey) ?
+            [...cache.orders.get(reverseKey)].reverse() :
+            getSortedIndices(cache.tests, key, ascending, customOrder)
+        cache.orders.set(cacheKey, order)
     }
-    return sorted
+    return cache.orders.get(cacheKey)
 }
 
-const doInitSort = () => {
-    const type = storageModule.getSort()
-    const ascending = storageModule.getSortDirection()
+const genericSort = (list, key, ascending, customOrder) => {
+    const cache = getSortCache()
+    const inCache = list.every(({ id }) => cache.positions.has(id))
+    if (!inCache) {
+        return getSortedIndices(list, key, ascending, customOrder).map((index) => list[index])
+    }
+
+    // Keep the (possibly modified) objects of the given list, in cached order
+    const selected = new Array(cache.tests.length)
+    list.forEach((test) => {
+        selected[cache.positions.get(test.id)] = test
+    })
+    return getCachedOrder(cache, key, ascending, customOrder).reduce((sorted, index) => {
+        if (selected[index]) {
+            sorted.push(selected[index])
+        }
+        return sorted
+    }, [])
+}
+
+const doInitSort = (type = storageModule.getSort(), ascending = storageModule.getSortDirection()) => {
     const list = manager.testSubset
     const initialOrder = ['Error', 'Failed', 'Rerun', 'XFailed', 'XPassed', 'Skipped', 'Passed']
     if (type?.toLowerCase() === 'original') {
@@ -37,17 +103,28 @@ const doInitSort = () => {
     }
 }
 
-const doSort = (type) => {
+const applySort = (type, ascending) => {
+    const list = manager.testSubset
+
+    const sortedList = genericSort(list, type, ascending)
+    manager.setRender(sortedList)
+}
+
+const updateSort = (type) => {
     const newSortType = storageModule.getSort() !== type
     const currentAsc = storageModule.getSortDirection()
     const ascending = newSortType ? true : !currentAsc
     storageModule.setSort(type)
     storageModule.setSortDirection(ascending)
-    const list = manager.testSubset
+    return ascending
+}
 
-    const sortedList = genericSort(list, type, ascending)
-    manager.setRender(sortedList)
+const doSort = (type) => {
+    applySort(type, updateSort(type))
 }
 
+exports.applySort = applySort
 exports.doSort = doSort
 exports.doInitSort = doInitSort
+exports.genericSort = genericSort
+exports.updateSort = updateSort
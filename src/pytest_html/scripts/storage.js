@@ -58,10 +58,24 @@ const setSort = (type) => {
     history.pushState({}, null, unescape(url.href))
 }
 
-const getCollapsedCategory = (config) => {
+const getSearch = () => {
+    const url = new URL(window.location.href)
+    return {
+        query: new URLSearchParams(url.search).get('search') || '',
+        logs: JSON.parse(sessionStorage.getItem('searchLogs')) || false,
+    }
+}
+const setSearch = ({ query, logs }) => {
+    const url = new URL(window.location.href)
+    query ? url.searchParams.set('search', query) : url.searchParams.delete('search')
+    history.replaceState({}, null, url.href)
+    sessionStorage.setItem('searchLogs', logs)
+}
+
+const getCollapsedCategory = (config, href = typeof window !== 'undefined' ? window.location.href : null) => {
     let categories
-    if (typeof window !== 'undefined') {
-        const url = new URL(window.location.href)
+    if (href) {
+        const url = new URL(href)
         const collapsedItems = new URLSearchParams(url.search).get('collapsed')
         switch (true) {
             case !config && collapsedItems === null:
@@ -97,6 +111,8 @@ module.exports = {
     setSort,
     setSortDirection,
     getCollapsedCategory,
+    getSearch,
+    setSearch,
     possibleFilters,
     possibleResults,
 }
@@ -6,8 +6,11 @@ from pytest_html.basereport import BaseReport
 
 
 class SelfContainedReport(BaseReport):
-    def __init__(self, report_path, config):
-        super().__init__(report_path, config)
+    # the report is a single file, it is reloaded instead
+    _live_updates = False
+
+    def __init__(self, report_path, config, **kwargs):
+        super().__init__(report_path, config, **kwargs)
 
     @property
     def css(self):
@@ -33,4 +36,7 @@ class SelfContainedReport(BaseReport):
             return content
 
     def _generate_report(self, *args, **kwargs):
-        super()._generate_report(self_contained=True)
+        super()._generate_report(self_contained=True, **kwargs)
+
+    def _generate_failures_report(self, *args, **kwargs):
+        super()._generate_failures_report(self_contained=True)
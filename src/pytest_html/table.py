@@ -1,6 +1,10 @@
 import re
 import warnings
 
+_SORTABLE_CELL = re.compile(r'<td class="col-(\w+)">(.*?)</')
+_COLUMN_TYPE = re.compile(r'data-column-type="(\w+)')
+_HEADER_TAG = re.compile(r"<th\b[^>]*>")
+
 
 class Table:
     def __init__(self):
@@ -55,7 +59,21 @@ class Cell(Table):
         self.insert(f"Z{self._append_counter}", item)
         self._append_counter += 1
 
-    def insert(self, index, html):
+    def insert(self, index, html, column=None, sort_value=None):
+        html = self._to_html(html)
+        if column is None:
+            self._extract_sortable(html)
+        elif sort_value is not None:
+            self._sortables[column] = sort_value
+        self._html[index] = html
+
+    def pop(self, *args):
+        self._pop_counter += 1
+
+    def get_pops(self):
+        return self._pop_counter
+
+    def _to_html(self, html):
         # backwards-compat
         if not isinstance(html, str):
             if html.__module__.startswith("py."):
@@ -66,17 +84,10 @@ class Cell(Table):
                 )
             html = str(html)
             html = html.replace("col=", "data-column-type=")
-        self._extract_sortable(html)
-        self._html[index] = html
-
-    def pop(self, *args):
-        self._pop_counter += 1
-
-    def get_pops(self):
-        return self._pop_counter
+        return html
 
     def _extract_sortable(self, html):
-        match = re.search(r'<td class="col-(\w+)">(.*?)</', html)
+        match = _SORTABLE_CELL.search(html)
         if match:
             sortable = match.group(1)
             value = match.group(2)
@@ -84,10 +95,74 @@ class Cell(Table):
 
 
 class Header(Cell):
-    pass
+    def __init__(self):
+        super().__init__()
+        self._sortable_columns = []
+        self._columns = []
+
+    @property
+    def sortable_columns(self):
+        return self._sortable_columns
+
+    @property
+    def columns(self):
+        return self._columns
+
+    def add_column(self, column, title, sortable=False, index=None):
+        # The cells of the column are rendered from the values set with
+        # Row.set_value, no HTML is stored per row.
+        self._columns.append(
+            {"column": column, "title": title, "sortable": sortable, "index": index}
+        )
+        if sortable:
+            self._sortable_columns.append(column)
+
+    def insert(self, index, html, column=None, sortable=False):
+        html = self._to_html(html)
+        if column is None:
+            self._extract_sortable(html)
+        elif sortable:
+            self._sortable_columns.append(column)
+            html = self._mark_sortable(html, column)
+        self._html[index] = html
+
+    def _mark_sortable(self, html, column):
+        # The report sorts on the header cells with the "sortable" class
+        match = _HEADER_TAG.search(html)
+        if not match:
+            return html
+        tag = match.group(0)
+        if "data-column-type=" not in tag:
+            tag = f'{tag[:-1]} data-column-type="{column}">'
+        if 'class="' in tag:
+            tag = tag.replace('class="', f'class="sortable {column} ', 1)
+        else:
+            tag = tag.replace("<th", f'<th class="sortable {column}"', 1)
+        return html[: match.start()] + tag + html[match.end() :]
+
+    def _extract_sortable(self, html):
+        if "sortable" in html:
+            match = _COLUMN_TYPE.search(html)
+            if match:
+                self._sortable_columns.append(match.group(1))
 
 
 class Row(Cell):
+    def __init__(self):
+        super().__init__()
+        self._values = {}
+
+    @property
+    def values(self):
+        return self._values
+
+    def set_value(self, column, value, sort_value=None):
+        if not isinstance(value, (str, int, float, bool, type(None))):
+            value = str(value)
+        self._values[column] = value
+        if sort_value is not None:
+            self._sortables[column] = sort_value
+
     def __delitem__(self, key):
         # This means the item should be removed
         self._html = None
@@ -1,8 +1,17 @@
 import importlib
 import json
+import os
+import time
+import uuid
+from contextlib import nullcontext
 from functools import lru_cache
+from pathlib import Path
 from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Union
 
 
 @lru_cache()
@@ -15,6 +24,152 @@ def ansi_support():
         pass
 
 
+def split_node_id(node_id: str) -> Tuple[str, str]:
+    """Split a node ID into its module/class prefix and the name after it.
+
+    A ``::`` inside the parameters of a test is part of the name.
+    """
+    params = node_id.find("[")
+    separator = node_id.rfind("::", 0, len(node_id) if params == -1 else params)
+    if separator == -1:
+        return "", node_id
+    return node_id[: separator + 2], node_id[separator + 2 :]
+
+
+def _interner(table: Dict[str, int]) -> Callable[[str], int]:
+    return lambda value: table.setdefault(value, len(table))
+
+
+def _id_encoder(prefixes: Dict[str, int], encode_name=lambda name: name):
+    intern_prefix = _interner(prefixes)
+
+    def encode_id(node_id):
+        prefix, name = split_node_id(node_id)
+        return [intern_prefix(prefix), encode_name(name)]
+
+    return encode_id
+
+
+def encode_rows(tests: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Return the tests with node and test IDs stored relative to a prefix table.
+
+    Every ID becomes ``[prefix index, name]``, so the module and class part
+    shared by the tests of a module is stored once.
+    """
+    prefixes: Dict[str, int] = {}
+    encode_id = _id_encoder(prefixes)
+
+    encoded = [
+        [
+            encode_id(nodeid),
+            [
+                {**test, "testId": encode_id(test["testId"])}
+                if isinstance(test.get("testId"), str)
+                else test
+                for test in results
+            ],
+        ]
+        for nodeid, results in tests.items()
+    ]
+    return {"layout": "rows", "prefixes": list(prefixes), "tests": encoded}
+
+
+def encode_columnar(tests: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Return the tests as one array per field, with strings stored once.
+
+    Values of string fields, and the JSON of non-scalar fields, are replaced by
+    their index in a table shared by all fields. Missing values are ``None``.
+    Node and test IDs are stored as ``[prefix index, name index]``.
+    """
+    strings: Dict[str, int] = {}
+    prefixes: Dict[str, int] = {}
+    intern = _interner(strings)
+    encode_id = _id_encoder(prefixes, intern)
+
+    rows = [(nodeid, test) for nodeid, results in tests.items() for test in results]
+    fields = list(dict.fromkeys(field for _, test in rows for field in test))
+
+    columns = {"nodeid": {"type": "id", "values": [encode_id(n) for n, _ in rows]}}
+    for field in fields:
+        values = [test.get(field) for _, test in rows]
+        present = [value for value in values if value is not None]
+        if all(isinstance(value, str) for value in present):
+            column_type, encode = "string", intern
+            if field == "testId":
+                column_type, encode = "id", encode_id
+        elif all(isinstance(value, (bool, int, float)) for value in present):
+            column_type, encode = "value", None
+        else:
+            column_type, encode = "json", lambda value: intern(json.dumps(value))
+        if encode:
+            values = [None if value is None else encode(value) for value in values]
+        columns[field] = {"type": column_type, "values": values}
+
+    return {
+        "layout": "columnar",
+        "prefixes": list(prefixes),
+        "strings": list(strings),
+        "columns": columns,
+    }
+
+
+class Profiler:
+    """Count the calls of, and the time spent in, phases of the plugin."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._phases: Dict[str, List[float]] = {}
+
+    def measure(self, phase: str):
+        if not self.enabled:
+            return nullcontext()
+        return _Timer(self._phases.setdefault(phase, [0, 0.0]))
+
+    @property
+    def phases(self) -> Dict[str, Dict[str, float]]:
+        return {
+            phase: {"calls": calls, "seconds": seconds}
+            for phase, (calls, seconds) in self._phases.items()
+        }
+
+
+class _Timer:
+    def __init__(self, totals):
+        self._totals = totals
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self._totals[0] += 1
+        self._totals[1] += time.perf_counter() - self._start
+
+
+def write_if_changed(path: Path, content: Union[str, bytes]) -> bool:
+    """Write the content to the file, unless it already has that content.
+
+    Returns whether the file was written.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    try:
+        if path.stat().st_size == len(content) and path.read_bytes() == content:
+            return False
+    except FileNotFoundError:
+        pass
+    # Replaced at once, e.g. a shared asset read by other sessions or a browser
+    temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with temp_path.open("xb") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+    return True
+
+
 def cleanup_unserializable(d: Dict[str, Any]) -> Dict[str, Any]:
     """Return new dict with entries that are not json serializable by their str()."""
     result = {}
@@ -0,0 +1,113 @@
+/* eslint-disable no-console */
+// Times the report in a browser on generated data of increasing size:
+//
+//     npm run build:ci
+//     CHROME_PATH=/path/to/chrome npm run benchmark -- 1000 10000 50000
+//
+// Without CHROME_PATH the installed Google Chrome is used.
+const fs = require('fs')
+const os = require('os')
+const path = require('path')
+const puppeteer = require('puppeteer-core')
+
+const resources = path.join(__dirname, '../src/pytest_html/resources')
+const [template, styles, app] = ['index.jinja2', 'style.css', 'app.js'].map((name) =>
+    fs.readFileSync(path.join(resources, name), 'utf8'))
+
+// A self-contained report, see SelfContainedReport
+const renderReport = (payload) => template
+    .replace(/{% if self_contained %}([\s\S]*?){% else %}[\s\S]*?{% endif %}/, '$1')
+    .replace(/{% if script %}[\s\S]*?{% else %}([\s\S]*?){% endif %}/, '$1')
+    .replace('{{- styles|safe }}', () => styles)
+    .replace('{% include "app.js" %}', () => app)
+    .replace('{{ test_data|safe }}', () => payload)
+    .replace(/{%[\s\S]*?%}|{{[\s\S]*?}}/g, '')
+
+const results = ['Passed', 'Passed', 'Passed', 'Passed', 'Passed', 'Passed', 'Failed', 'Skipped', 'XFailed', 'Error']
+
+const generatePayload = (size, logSize = 256) => {
+    const tests = {}
+    for (let index = 0; index < size; index++) {
+        const nodeid = `tests/module_${Math.floor(index / 100)}.py::TestClass::test_case[${index}]`
+        tests[nodeid] = [{
+            testId: nodeid,
+            result: results[index % results.length],
+            duration: (index * 7919 % 1000) / 100,
+            resultsTableRow: {},
+            tableHtml: [],
+            extras: [],
+            log: `E   assert ${index} == 0\n${'x'.repeat(logSize)}`,
+        }]
+    }
+    return JSON.stringify({
+        title: 'benchmark',
+        collectedItems: size,
+        runningState: 'Finished',
+        environment: {},
+        tests,
+        resultsTableHeader: {},
+        additionalSummary: { prefix: [], summary: [], postfix: [] },
+        headerPops: 0,
+    })
+}
+
+// Resolves with the page's time once the table is redrawn and all its rows
+// are rendered, see main.renderContent
+const rendered = (page) => page.waitForFunction(() => {
+    const header = document.querySelector('#results-table-head')
+    const placeholder = document.querySelector('#results-table > tbody:not(.results-table-row)')
+    return header && !('stale' in header.dataset) && !placeholder && performance.now()
+}, { polling: 'raf', timeout: 0 }).then((handle) => handle.jsonValue())
+
+const time = async (page, selector) => {
+    const start = await page.evaluate((target) => {
+        document.querySelector('#results-table-head').dataset.stale = ''
+        const now = performance.now()
+        document.querySelector(target).click()
+        return now
+    }, selector)
+    return await rendered(page) - start
+}
+
+const benchmark = async (browser, directory, size) => {
+    const payload = generatePayload(size)
+    const report = path.join(directory, `report-${size}.html`)
+    fs.writeFileSync(report, renderReport(payload))
+
+    const page = await browser.newPage()
+    try {
+        await page.goto(`file://${report}`, { waitUntil: 'domcontentloaded' })
+        // since the page started loading
+        const load = await rendered(page)
+        const sort = await time(page, '#results-table-head [data-column-type="duration"]')
+        const filter = await time(page, 'input[data-test-result="passed"]')
+        const expandAll = await time(page, '#show_all_details')
+        return { size, payload: payload.length, load, sort, filter, expandAll }
+    } finally {
+        await page.close()
+    }
+}
+
+const main = async (sizes) => {
+    const directory = fs.mkdtempSync(path.join(os.tmpdir(), 'pytest-html-benchmark-'))
+    const browser = await puppeteer.launch({
+        ...(process.env.CHROME_PATH ? { executablePath: process.env.CHROME_PATH } : { channel: 'chrome' }),
+        // large reports keep the page busy for longer than the default 3 minutes
+        protocolTimeout: 0,
+    })
+    try {
+        console.log(['tests', 'payload MiB', 'load ms', 'sort ms', 'filter ms', 'expand ms'].map((title) =>
+            title.padStart(12)).join(''))
+        for (const size of sizes) {
+            const { payload, load, sort, filter, expandAll } = await benchmark(browser, directory, size)
+            console.log([size, (payload / 2 ** 20).toFixed(2), ...[load, sort, filter, expandAll].map((ms) =>
+                ms.toFixed(0))].map((value) => String(value).padStart(12)).join(''))
+        }
+    } finally {
+        await browser.close()
+        fs.rmSync(directory, { recursive: true, force: true })
+    }
+}
+
+const sizes = process.argv.slice(2).map(Number)
+main(sizes.length ? sizes : [1000, 10000, 50000])
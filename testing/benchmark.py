@@ -0,0 +1,241 @@
+"""Benchmark the report generation of the plugin.
+
+Synthesized test reports are fed to the plugin's hooks, so no tests are run
+and no browser is needed. For every report flavor and number of tests this
+measures the latency of the hooks per test, the total time of the session and
+the peak memory allocated by the plugin.
+
+Run from the repository root, for example::
+
+    python testing/benchmark.py --tests 100 1000 --log-size 2048 --extras 2
+
+The report is rewritten after every test, so the time per test grows with the
+size of the report, and the total time with its square: 1000 tests take about
+20 seconds, 2000 tests over a minute. With --final-only the report is only
+written at the end of the session, which measures the hooks and the data of
+large runs, for example::
+
+    python testing/benchmark.py --final-only --tests 10000 100000
+"""
+import argparse
+import base64
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+from _pytest.config import _prepareconfig
+from _pytest.reports import TestReport
+
+from pytest_html import extras
+from pytest_html.report import Report
+from pytest_html.selfcontained_report import SelfContainedReport
+
+FLAVORS = {
+    "report": Report,
+    "self-contained": SelfContainedReport,
+}
+
+# a 1x1 transparent PNG
+PNG = base64.b64encode(
+    bytes.fromhex(
+        "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+        "1f15c4890000000d49444154789c6360000002000154a24f5d00000000"
+        "49454e44ae426082"
+    )
+).decode("ascii")
+
+
+def make_extras(count):
+    kinds = [
+        lambda: extras.png(PNG),
+        lambda: extras.text("some text"),
+        lambda: extras.url("https://example.com"),
+        lambda: extras.json({"key": "value"}),
+    ]
+    return [kinds[index % len(kinds)]() for index in range(count)]
+
+
+def make_reports(index, options, rng):
+    """Return the setup, call and teardown reports of one test."""
+    nodeid = (
+        f"tests/module_{index // 100}.py::TestClass{index // 10 % 10}"
+        f"::test_case[{index}]"
+    )
+    location = (nodeid.split("::")[0], index, nodeid)
+    failed = rng.random() < options.failure_rate
+    # identical logs are stored once in the report
+    duplicated = rng.random() < options.duplicate_log_rate
+    log = f"{'duplicated' if duplicated else index} {'x' * options.log_size}"
+    log = log[: options.log_size]
+    longrepr = f"AssertionError: {log}" if failed else None
+
+    def report(when, outcome="passed", longrepr=None, sections=()):
+        return TestReport(
+            nodeid, location, {}, outcome, longrepr, when, sections, duration=0.01
+        )
+
+    call = report(
+        "call",
+        "failed" if failed else "passed",
+        longrepr,
+        [("Captured stdout call", log)],
+    )
+    call.extras = make_extras(options.extras)
+    return [report("setup"), call, report("teardown")]
+
+
+def run_session(flavor, tests, options, report_path):
+    """Feed the reports of ``tests`` tests to a report, return the hook timings."""
+    args = ["-p", "no:cacheprovider"]
+    if options.split:
+        args += ["--html-split", options.split]
+    config = _prepareconfig(args)
+    config._do_configure()
+    try:
+        report = FLAVORS[flavor](report_path, config)
+        session = pytest.Session.from_config(config)
+        rng = random.Random(options.seed)
+
+        start = time.perf_counter()
+        report.pytest_sessionstart(session)
+        report._report.set_data("collectedItems", tests)
+        if options.final_only:
+            # skip the rewrite after every test, see pytest_runtest_logreport
+            report._generate_report = lambda **kwargs: None
+        latencies = []
+        for index in range(tests):
+            reports = make_reports(index, options, rng)
+            test_start = time.perf_counter()
+            for test_report in reports:
+                report.pytest_runtest_logreport(test_report)
+            report.pytest_runtest_logfinish(reports[0].nodeid)
+            latencies.append(time.perf_counter() - test_start)
+        if options.final_only:
+            del report._generate_report
+        finish_start = time.perf_counter()
+        report.pytest_sessionfinish(session)
+        end = time.perf_counter()
+    finally:
+        config._ensure_unconfigure()
+
+    return {
+        "latencies": latencies,
+        "finish": end - finish_start,
+        "total": end - start,
+    }
+
+
+def measure(flavor, tests, options):
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = Path(tmp, "report.html")
+        result = run_session(flavor, tests, options, report_path)
+        result["size"] = report_path.stat().st_size
+
+    if options.memory:
+        with tempfile.TemporaryDirectory() as tmp:
+            # a separate run, tracemalloc slows down every allocation
+            tracemalloc.start()
+            try:
+                run_session(flavor, tests, options, Path(tmp, "report.html"))
+                result["peak"] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+    return result
+
+
+def format_result(flavor, tests, result):
+    latencies = sorted(result["latencies"])
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0
+    columns = [
+        f"{flavor:<15}",
+        f"{tests:>7}",
+        f"{statistics.median(latencies) * 1000 if latencies else 0:>10.2f}",
+        f"{p95 * 1000:>10.2f}",
+        f"{result['finish'] * 1000:>10.1f}",
+        f"{result['total']:>10.2f}",
+        f"{result['size'] / 2**20:>10.2f}",
+    ]
+    if "peak" in result:
+        columns.append(f"{result['peak'] / 2**20:>10.1f}")
+    return " ".join(columns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--tests",
+        type=int,
+        nargs="+",
+        default=[100, 1000],
+        help="numbers of tests to benchmark (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--final-only",
+        action="store_true",
+        help="only write the report at the end of the session, not after " "every test",
+    )
+    parser.add_argument(
+        "--flavor",
+        choices=FLAVORS,
+        action="append",
+        help="report flavor to benchmark, can be repeated (default: all)",
+    )
+    parser.add_argument(
+        "--log-size",
+        type=int,
+        default=1024,
+        help="characters of captured output per test (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--extras",
+        type=int,
+        default=0,
+        help="number of extras per test (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--duplicate-log-rate",
+        type=float,
+        default=0.0,
+        help="fraction of tests with the same captured output "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--failure-rate",
+        type=float,
+        default=0.1,
+        help="fraction of failing tests (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--split",
+        metavar="module|directory|N",
+        help="split the report over pages, see --html-split",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-memory",
+        dest="memory",
+        action="store_false",
+        help="skip the (slower) run measuring peak memory",
+    )
+    options = parser.parse_args(argv)
+
+    header = (
+        f"{'flavor':<15} {'tests':>7} {'median ms':>10} {'p95 ms':>10} "
+        f"{'finish ms':>10} {'total s':>10} {'size MiB':>10}"
+    )
+    if options.memory:
+        header += f" {'peak MiB':>10}"
+    print(header)
+    for tests in options.tests:
+        for flavor in options.flavor or FLAVORS:
+            result = measure(flavor, tests, options)
+            print(format_result(flavor, tests, result), flush=True)
+
+
+if __name__ == "__main__":
+    main()
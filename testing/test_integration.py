@@ -13,6 +13,9 @@ import pytest
 from assertpy import assert_that
 from bs4 import BeautifulSoup
 from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.support.ui import WebDriverWait
 
 pytest_plugins = ("pytester",)
 
@@ -27,7 +30,7 @@ OUTCOMES = {
 }
 
 
-def run(pytester, path="report.html", cmd_flags=None, query_params=None):
+def run(pytester, path="report.html", cmd_flags=None, query_params=None, wait_for=None):
     if cmd_flags is None:
         cmd_flags = []
 
@@ -57,6 +60,13 @@ def run(pytester, path="report.html", cmd_flags=None, query_params=None):
         # End workaround
 
         driver.get(f"file:///reports{path}?{query_params}")
+        # the report is rendered by its script, and e.g. media only once
+        # their row is shown
+        WebDriverWait(driver, 5).until(
+            expected_conditions.presence_of_element_located(
+                (By.CSS_SELECTOR, wait_for or "#results-table")
+            )
+        )
         return BeautifulSoup(driver.page_source, "html.parser")
     finally:
         driver.quit()
@@ -547,7 +557,12 @@ class TestHTML:
         """
         )
         pytester.makepyfile("def test_pass(): pass")
-        page = run(pytester, cmd_flags=["--self-contained-html"])
+        page = run(
+            pytester,
+            cmd_flags=["--self-contained-html"],
+            query_params={"collapsed": ""},
+            wait_for=".summary .media img[src^='data:']",
+        )
 
         # element = page.select_one(".summary a[class='col-links__extra image']")
         src = f"data:{mime_type};base64,{data}"
@@ -555,7 +570,7 @@ class TestHTML:
         # assert_that(element["href"]).is_equal_to(src)
 
         element = page.select_one(".summary .media img")
-        assert_that(str(element)).is_equal_to(f'<img src="{src}"/>')
+        assert_that(str(element)).is_equal_to(f'<img loading="lazy" src="{src}"/>')
 
     @pytest.mark.parametrize("mime_type, extension", [("video/mp4", "mp4")])
     def test_extra_video(self, pytester, mime_type, extension):
@@ -575,7 +590,12 @@ class TestHTML:
         """
         )
         pytester.makepyfile("def test_pass(): pass")
-        page = run(pytester, cmd_flags=["--self-contained-html"])
+        page = run(
+            pytester,
+            cmd_flags=["--self-contained-html"],
+            query_params={"collapsed": ""},
+            wait_for=".summary .media source[src^='data:']",
+        )
 
         # element = page.select_one(".summary a[class='col-links__extra video']")
         src = f"data:{mime_type};base64,{data}"
@@ -584,8 +604,31 @@ class TestHTML:
 
         element = page.select_one(".summary .media video")
         assert_that(str(element)).is_equal_to(
-            f'<video controls="">\n<source src="{src}" type="{mime_type}"/>\n</video>'
+            f'<video controls="" preload="none">\n'
+            f'<source src="{src}" type="{mime_type}"/>\n</video>'
+        )
+
+    def test_extra_media_of_collapsed_row(self, pytester):
+        data = base64.b64encode(b"image").decode("utf-8")
+        pytester.makeconftest(
+            f"""
+            import pytest
+
+            @pytest.hookimpl(hookwrapper=True)
+            def pytest_runtest_makereport(item, call):
+                outcome = yield
+                report = outcome.get_result()
+                if report.when == 'call':
+                    from pytest_html import extras
+                    report.extras = [extras.png('{data}')]
+        """
         )
+        pytester.makepyfile("def test_pass(): pass")
+        page = run(pytester, cmd_flags=["--self-contained-html"])
+
+        assert_that(is_collapsed(page, "test_pass")).is_true()
+        element = page.select_one(".summary .media img")
+        assert_that(str(element)).is_equal_to('<img loading="lazy" src=""/>')
 
     def test_xdist(self, pytester):
         pytester.makepyfile("def test_xdist(): pass")
@@ -1,11 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import pytest_html
+from pytest_html.basereport import _compile_redact_list
+from pytest_html.basereport import _template_environment
+from pytest_html.table import Header
+from pytest_html.table import Row
+from pytest_html.util import encode_columnar
+from pytest_html.util import encode_rows
+from pytest_html.util import split_node_id
+from pytest_html.util import write_if_changed
+
 pytest_plugins = ("pytester",)
 
+RESOURCES_PATH = Path(pytest_html.__file__).parent / "resources"
+
 
 def run(pytester, path="report.html", *args):
     path = pytester.path.joinpath(path)
     return pytester.runpytest("--html", path, *args)
 
 
+def get_data(path):
+    html = Path(path).read_text()
+    start = html.index('<script id="data-container" type="application/json">')
+    end = html.index("</script>", start)
+    return json.loads(html[html.index(">", start) + 1 : end])
+
+
+def get_tests(data):
+    # the results of all nodes, see util.encode_rows
+    return [test for _, results in data["tests"]["tests"] for test in results]
+
+
 def test_duration_format_deprecation_warning(pytester):
     pytester.makeconftest(
         """
@@ -24,3 +56,661 @@ def test_duration_format_deprecation_warning(pytester):
             "*DeprecationWarning: 'duration_formatter'*",
         ],
     )
+
+
+def test_live_updates(pytester):
+    pytester.makepyfile(
+        """
+        from pathlib import Path
+
+        def test_pass(): print("shared output")
+        def test_fail(): assert False
+        def test_also_pass(): print("shared output")
+        def test_copy():
+            Path("running.js").write_text(Path("report.delta.0.js").read_text())
+    """
+    )
+    run(pytester, "report.html", "--html-live-updates")
+
+    def read_records(path):
+        lines = path.read_text().splitlines()
+        return [
+            json.loads(line[len("pytestHtmlDelta(") : -len(");")]) for line in lines
+        ]
+
+    records = read_records(pytester.path.joinpath("running.js"))
+    assert [record["sequence"] for record in records] == [1, 2, 3, 4]
+    assert records[0]["state"] == {"collectedItems": 4}
+    assert [record["nodeid"] for record in records[1:]] == [
+        "test_live_updates.py::test_pass",
+        "test_live_updates.py::test_fail",
+        "test_live_updates.py::test_also_pass",
+    ]
+    assert records[2]["tests"][0]["result"] == "Failed"
+    # the shared log is only written once
+    ((pass_log, text),) = records[1]["logs"].items()
+    assert "shared output" in text
+    assert str(records[3]["tests"][0]["log"]) == pass_log
+    assert "logs" not in records[3]
+
+    # the final report has all results, an open report reloads it
+    records = read_records(pytester.path.joinpath("report.delta.0.js"))
+    assert records == [{"sequence": 6, "reload": True}]
+    assert get_data(pytester.path.joinpath("report.html"))["runningState"] == "Finished"
+
+
+def test_live_updates_are_opt_in(pytester):
+    pytester.makepyfile("def test_pass(): pass")
+    run(pytester)
+
+    assert not list(pytester.path.glob("report.delta.*.js"))
+    assert "deltaPrefix" not in get_data(pytester.path.joinpath("report.html"))
+
+
+def test_live_updates_are_removed_on_start(pytester):
+    stale = pytester.path.joinpath("report.delta.7.js")
+    stale.write_text("")
+    pytester.makepyfile("def test_pass(): pass")
+    run(pytester, "report.html", "--html-live-updates")
+
+    assert not stale.exists()
+
+
+def test_self_contained_report_has_no_live_updates(pytester):
+    pytester.makepyfile("def test_pass(): pass")
+    path = pytester.path.joinpath("self-contained", "report.html")
+    run(
+        pytester,
+        "report.html",
+        "--html-live-updates",
+        "--self-contained-html-path",
+        path,
+    )
+
+    assert pytester.path.joinpath("report.delta.0.js").exists()
+    assert list(path.parent.iterdir()) == [path]
+    assert "deltaPrefix" not in get_data(path)
+
+
+def test_report_data_is_embedded_as_json(pytester):
+    pytester.makepyfile(
+        """
+        def test_pass():
+            print("</script><!-- 'quoted' & \\"double quoted\\" -->")
+    """
+    )
+    run(pytester)
+
+    data = get_data(pytester.path.joinpath("report.html"))
+    (test,) = get_tests(data)
+    assert "</script><!-- 'quoted' & \"double quoted\" -->" in data["logs"][test["log"]]
+
+
+def test_encode_columnar():
+    tests = {
+        "test_a": [{"testId": "test_a", "result": "Passed", "duration": 1.5}],
+        "test_b": [
+            {"testId": "test_b::setup", "result": "Error", "duration": 0.1},
+            {"testId": "test_b", "result": "Passed", "duration": 2, "log": "x"},
+        ],
+    }
+    encoded = encode_columnar(tests)
+
+    prefixes = encoded["prefixes"]
+    strings = encoded["strings"]
+    columns = encoded["columns"]
+    assert encoded["layout"] == "columnar"
+    assert len(strings) == len(set(strings))
+    assert [prefixes[p] + strings[ref] for p, ref in columns["nodeid"]["values"]] == [
+        "test_a",
+        "test_b",
+        "test_b",
+    ]
+    assert columns["testId"]["type"] == "id"
+    assert "test_b::" in prefixes
+    assert [strings[ref] for ref in columns["result"]["values"]] == [
+        "Passed",
+        "Error",
+        "Passed",
+    ]
+    assert columns["duration"] == {"type": "value", "values": [1.5, 0.1, 2]}
+    assert columns["log"]["values"][:2] == [None, None]
+
+
+def test_columnar_report_data(pytester):
+    pytester.makeini(
+        """
+        [pytest]
+        columnar_report_data = true
+    """
+    )
+    pytester.makepyfile("def test_pass(): pass")
+    run(pytester)
+
+    data = get_data(pytester.path.joinpath("report.html"))
+    assert data["tests"]["layout"] == "columnar"
+    assert data["tests"]["prefixes"] == ["test_columnar_report_data.py::"]
+    assert "test_pass" in data["tests"]["strings"]
+
+
+@pytest.mark.parametrize(
+    "node_id, expected",
+    [
+        ("test_a.py", ("", "test_a.py")),
+        ("test_a.py::test_b", ("test_a.py::", "test_b")),
+        ("test_a.py::TestB::test_c", ("test_a.py::TestB::", "test_c")),
+        ("test_a.py::test_b::setup", ("test_a.py::test_b::", "setup")),
+        ("test_a.py::test_b[x::y]", ("test_a.py::", "test_b[x::y]")),
+    ],
+)
+def test_split_node_id(node_id, expected):
+    assert split_node_id(node_id) == expected
+
+
+def test_encode_rows():
+    tests = {
+        "a.py::T::test_a": [{"testId": "a.py::T::test_a", "result": "Passed"}],
+        "a.py::T::test_b": [
+            {"testId": "a.py::T::test_b::setup", "result": "Error"},
+            {"testId": "a.py::T::test_b", "result": "Passed"},
+        ],
+    }
+    encoded = encode_rows(tests)
+
+    prefixes = encoded["prefixes"]
+    assert encoded["layout"] == "rows"
+    assert prefixes == ["a.py::T::", "a.py::T::test_b::"]
+    decoded = {
+        prefixes[p]
+        + name: [
+            {**test, "testId": prefixes[test["testId"][0]] + test["testId"][1]}
+            for test in results
+        ]
+        for (p, name), results in encoded["tests"]
+    }
+    assert decoded == tests
+    # the reported data itself is left untouched
+    assert tests["a.py::T::test_a"][0]["testId"] == "a.py::T::test_a"
+
+
+def test_identical_logs_are_stored_once(pytester):
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.fixture
+        def broken():
+            raise RuntimeError("broken fixture")
+
+        @pytest.mark.parametrize("x", range(3))
+        def test_broken(broken, x):
+            pass
+
+        def test_teardown_log(request):
+            request.addfinalizer(lambda: print("in teardown"))
+    """
+    )
+    run(pytester)
+
+    data = get_data(pytester.path.joinpath("report.html"))
+    tests = get_tests(data)
+    logs = data["logs"]
+
+    broken = [test["log"] for test in tests if test["result"] == "Error"]
+    assert len(broken) == 3
+    assert len(set(broken)) == 1
+    assert "broken fixture" in logs[broken[0]]
+    assert sum("broken fixture" in (log or "") for log in logs) == 1
+
+    (teardown,) = [test for test in tests if test["testId"][1] == "test_teardown_log"]
+    assert "in teardown" in logs[teardown["log"]]
+
+
+def test_html_profile(pytester):
+    pytester.makepyfile("def test_pass(): pass")
+    result = run(pytester, "report.html", "--html-profile")
+
+    result.stdout.re_match_lines(
+        [
+            r".*Generated html report: .*",
+            r"html report profile: \d+\.\d{3}s",
+        ]
+    )
+    result.stdout.re_match_lines([r"\s+template render\s+\d+ calls\s+\d+\.\d{3}s"])
+
+    data = get_data(pytester.path.joinpath("report.html"))
+    assert data["profile"]["logs"]["calls"] == 1
+    assert data["profile"]["table row hook"]["calls"] == 1
+
+
+def test_passed_setup_and_teardown_skip_hooks(pytester):
+    pytester.makeconftest(
+        """
+        calls = []
+
+        def pytest_html_results_table_row(report, cells):
+            calls.append(report.when)
+
+        def pytest_html_results_table_html(report, data):
+            calls.append(report.when)
+
+        def pytest_terminal_summary(terminalreporter):
+            terminalreporter.write_line("hook calls: " + ",".join(calls))
+    """
+    )
+    pytester.makepyfile(
+        """
+        def test_pass(request):
+            request.addfinalizer(lambda: print("in teardown"))
+    """
+    )
+    result = run(pytester)
+    result.stdout.fnmatch_lines(["hook calls: call,call"])
+
+    data = get_data(pytester.path.joinpath("report.html"))
+    (test,) = get_tests(data)
+    assert "in teardown" in data["logs"][test["log"]]
+
+
+def test_table_sortables_from_html():
+    header = Header()
+    header.insert(1, '<th class="sortable time" data-column-type="time">Time</th>')
+    header.insert(2, '<th data-column-type="description">Description</th>')
+    assert header.sortable_columns == ["time"]
+
+    row = Row()
+    row.insert(1, '<td class="col-time">A time</td>')
+    assert row.sortables == {"time": "A time"}
+
+
+def test_table_sortables_from_arguments():
+    header = Header()
+    header.insert(1, "<th>Time</th>", column="time", sortable=True)
+    header.insert(2, "<th>Description</th>", column="description")
+    header.insert(3, '<th class="col-size">Size</th>', column="size", sortable=True)
+    assert header.sortable_columns == ["time", "size"]
+    assert header.html == {
+        1: '<th class="sortable time" data-column-type="time">Time</th>',
+        2: "<th>Description</th>",
+        3: '<th class="sortable size col-size" data-column-type="size">Size</th>',
+    }
+
+    row = Row()
+    row.insert(1, "<td>1.5 s</td>", column="time", sort_value=1.5)
+    row.insert(2, '<td class="col-description">Not sorted</td>', column="description")
+    assert row.sortables == {"time": 1.5}
+    assert row.html == {
+        1: "<td>1.5 s</td>",
+        2: '<td class="col-description">Not sorted</td>',
+    }
+
+
+def test_typed_sort_values(pytester):
+    pytester.makeconftest(
+        """
+        def pytest_html_results_table_header(cells):
+            cells.insert(1, "<th>Size</th>", column="size", sortable=True)
+
+        def pytest_html_results_table_row(report, cells):
+            cells.insert(1, "<td>10 kB</td>", column="size", sort_value=10000)
+    """
+    )
+    pytester.makepyfile("def test_pass(): pass")
+    run(pytester)
+
+    data = get_data(pytester.path.joinpath("report.html"))
+    assert data["resultsTableSortables"] == ["size"]
+    assert data["resultsTableHeader"] == {
+        "1": '<th class="sortable size" data-column-type="size">Size</th>'
+    }
+    (test,) = get_tests(data)
+    assert test["size"] == 10000
+
+
+def test_table_columns(pytester):
+    pytester.makeconftest(
+        """
+        def pytest_html_results_table_header(cells):
+            cells.add_column("size", "Size", sortable=True, index=1)
+            cells.add_column("owner", "Owner")
+
+        def pytest_html_results_table_row(report, cells):
+            cells.set_value("size", "10 kB", sort_value=10000)
+            cells.set_value("owner", object)
+    """
+    )
+    pytester.makepyfile("def test_pass(): pass")
+    run(pytester)
+
+    data = get_data(pytester.path.joinpath("report.html"))
+    assert data["resultsTableColumns"] == [
+        {"column": "size", "title": "Size", "sortable": True, "index": 1},
+        {"column": "owner", "title": "Owner", "sortable": False, "index": None},
+    ]
+    assert data["resultsTableSortables"] == ["size"]
+    (test,) = get_tests(data)
+    assert test["resultsTableRow"] == {}
+    assert test["resultsTableValues"] == {"size": "10 kB", "owner": str(object)}
+    assert test["size"] == 10000
+
+
+def test_report_modules_are_imported_lazily():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import pytest_html.plugin"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = {line.split("|")[-1].strip() for line in result.stderr.splitlines()}
+    assert "pytest_html.plugin" in imported
+    for module in ["jinja2", "ansi2html", "pytest_html.basereport"]:
+        assert module not in imported
+
+
+def test_html_report_class_is_still_available():
+    from pytest_html.basereport import BaseReport
+    from pytest_html.plugin import HTMLReport
+
+    assert HTMLReport is BaseReport
+
+
+def test_compiled_template_is_cached(pytester):
+    _template_environment.cache_clear()
+    pytester.makepyfile("def test_pass(): pass")
+    run(pytester, "report.html", "-p", "cacheprovider")
+
+    cache_dir = pytester.path.joinpath(".pytest_cache", "d", "pytest-html")
+    assert list(cache_dir.glob("*.cache"))
+
+
+def test_compiled_template_is_reused(pytester):
+    _template_environment.cache_clear()
+    for name in ["first", "second"]:
+        # a rootdir, and so a pytest cache, of its own
+        rootdir = pytester.mkdir(name)
+        rootdir.joinpath("pytest.ini").write_text("[pytest]")
+        rootdir.joinpath("test_pass.py").write_text("def test_pass(): pass")
+        run(pytester, f"{name}/report.html", "-p", "cacheprovider", rootdir)
+
+    assert _template_environment.cache_info().misses == 1
+    cache_dir = Path(".pytest_cache", "d", "pytest-html")
+    assert list(pytester.path.joinpath("first", cache_dir).glob("*.cache"))
+    # not compiled again
+    assert not list(pytester.path.joinpath("second", cache_dir).glob("*.cache"))
+
+
+def test_write_if_changed(tmp_path):
+    path = tmp_path / "style.css"
+    assert write_if_changed(path, "body {}")
+    mtime = path.stat().st_mtime_ns
+    assert not write_if_changed(path, b"body {}")
+    assert path.stat().st_mtime_ns == mtime
+    inode = path.stat().st_ino
+    assert write_if_changed(path, "body { color: red; }")
+    assert path.read_text() == "body { color: red; }"
+    # replaced, not rewritten in place
+    assert path.stat().st_ino != inode
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_custom_css_changes_are_picked_up(pytester):
+    pytester.makepyfile("def test_pass(): pass")
+    css = pytester.path.joinpath("custom.css")
+    css.write_text("body { color: red; }")
+    run(pytester, "report.html", "--css", css)
+    style = pytester.path.joinpath("assets", "style.css")
+    assert "color: red" in style.read_text()
+
+    css.write_text("body { color: blue; }")
+    os.utime(css, ns=(0, 0))
+    run(pytester, "report.html", "--css", css)
+    assert "color: blue" in style.read_text()
+
+
+def test_script_is_written_to_assets(pytester):
+    pytester.makepyfile("def test_pass(): pass")
+    run(pytester)
+
+    html = pytester.path.joinpath("report.html").read_text()
+    script = pytester.path.joinpath("assets", "app.js").read_text()
+    assert '<script src="assets/app.js"></script>' in html
+    assert script not in html
+    # in a function, to start the Web Worker from on file:// pages
+    assert script.startswith("function pytestHtmlApp() {")
+    assert RESOURCES_PATH.joinpath("app.js").read_text() in script
+
+
+def test_script_is_included_when_self_contained(pytester):
+    pytester.makepyfile("def test_pass(): pass")
+    run(pytester, "report.html", "--self-contained-html")
+
+    html = pytester.path.joinpath("report.html").read_text()
+    assert "<script src=" not in html
+    assert not pytester.path.joinpath("assets").exists()
+
+
+def test_shared_assets_dir(pytester):
+    pytester.makepyfile("def test_pass(): pass")
+    run(pytester, "reports/report.html", "--html-assets-dir", pytester.path / "static")
+
+    html = pytester.path.joinpath("reports", "report.html").read_text()
+    (static_path,) = pytester.path.joinpath("static").iterdir()
+    assert static_path.name.startswith("pytest-html-")
+    (css,) = static_path.glob("style-*.css")
+    assert f'src="../static/{static_path.name}/app.js"' in html
+    assert f'href="../static/{static_path.name}/{css.name}"' in html
+
+
+def test_self_contained_html_path(pytester):
+    pytester.makeconftest(
+        """
+        import pytest
+        from pytest_html import extras
+
+        calls = []
+
+        def pytest_html_results_table_row(report, cells):
+            calls.append(report.when)
+
+        @pytest.hookimpl(hookwrapper=True)
+        def pytest_runtest_makereport(item, call):
+            outcome = yield
+            report = outcome.get_result()
+            if report.when == "call":
+                report.extras = [extras.text("some text")]
+
+        def pytest_terminal_summary(terminalreporter):
+            terminalreporter.write_line("hook calls: " + ",".join(calls))
+    """
+    )
+    pytester.makepyfile("def test_pass(): pass")
+    path = pytester.path.joinpath("self-contained", "report.html")
+    result = run(pytester, "report.html", "--self-contained-html-path", path)
+    result.stdout.fnmatch_lines(
+        ["hook calls: call", "*/report.html -", "*/self-contained/report.html -"]
+    )
+
+    def extras_of(path):
+        data = get_data(path)
+        (test,) = get_tests(data)
+        return [extra["content"] for extra in test["extras"]]
+
+    assert extras_of(pytester.path.joinpath("report.html")) == [
+        "assets/test_self_contained_html_path.py__test_pass_0_0.txt"
+    ]
+    (content,) = extras_of(path)
+    assert content.startswith("data:text/plain;charset=utf-8;base64,")
+    assert not path.parent.joinpath("assets").exists()
+    assert '<script src="' not in path.read_text()
+
+
+def test_self_contained_html_path_requires_html(pytester):
+    pytester.makepyfile("def test_pass(): pass")
+    path = pytester.path.joinpath("report.html")
+    result = pytester.runpytest("--self-contained-html-path", path)
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*--self-contained-html-path requires --html*"])
+    assert not path.exists()
+
+
+def test_html_split(pytester):
+    pytester.makepyfile(
+        test_a="""
+            def test_a1(): print("a1")
+            def test_a2(): assert False
+        """,
+        test_b="def test_b(): print('b')",
+    )
+    run(pytester, "report.html", "--html-split", "module")
+
+    index = pytester.path.joinpath("report.html").read_text()
+    assert '<a href="report-1.html">test_a.py</a>' in index
+    assert '<a href="report-2.html">test_b.py</a>' in index
+    assert "data-container" not in index
+
+    page_path = pytester.path.joinpath("report-1.html")
+    data = get_data(page_path)
+    tests = get_tests(data)
+    assert [test["result"] for test in tests] == ["Passed", "Failed"]
+    assert len(data["logs"]) == 2
+    assert "a1" in data["logs"][tests[0]["log"]]
+    assert "deltaPrefix" not in data
+    assert '<a href="report.html">' in page_path.read_text()
+
+    data = get_data(pytester.path.joinpath("report-2.html"))
+    (test,) = get_tests(data)
+    assert data["logs"] == [data["logs"][test["log"]]]
+    assert "b" in data["logs"][0]
+
+
+def test_html_split_asks_to_reload(pytester):
+    pytester.makepyfile(
+        test_a="def test_a(): pass",
+        test_b="""
+            from pathlib import Path
+
+            def test_b():
+                for name in ["report.html", "report-1.html"]:
+                    Path(f"running-{name}").write_text(Path(name).read_text())
+        """,
+    )
+    run(pytester, "report.html", "--html-split", "module")
+
+    for name in ["running-report.html", "running-report-1.html"]:
+        html = pytester.path.joinpath(name).read_text()
+        assert "Reload this page to get the latest results!" in html
+        assert "New results are added as they finish." not in html
+
+
+@pytest.mark.parametrize("split, pages", [("directory", 1), ("1", 3), ("2", 2)])
+def test_html_split_pages(pytester, split, pages):
+    pytester.makepyfile(test_a="def test_a(): pass", test_b="def test_b(): pass")
+    pytester.makepyfile(test_c="def test_c(): pass")
+    run(pytester, "report.html", "--html-split", split)
+    assert len(list(pytester.path.glob("report-*.html"))) == pages
+
+
+def test_html_split_is_validated(pytester):
+    pytester.makepyfile("def test_pass(): pass")
+    result = run(pytester, "report.html", "--html-split", "0")
+    result.stderr.fnmatch_lines(["*expected 'module', 'directory' or a positive*"])
+
+
+def test_html_failures_first(pytester):
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.fixture
+        def broken():
+            raise RuntimeError("broken fixture")
+
+        def test_pass(): pass
+        def test_fail(): assert False
+        def test_error(broken): pass
+        def test_skip(): pytest.skip()
+    """
+    )
+    result = run(pytester, "report.html", "--html-failures-first")
+    result.stdout.fnmatch_lines(
+        [
+            "*Generated html failures report: file://*/report-failures.html*",
+            "*Generated html report: file://*/report.html*",
+        ]
+    )
+
+    failures_path = pytester.path.joinpath("report-failures.html")
+    data = get_data(failures_path)
+    tests = get_tests(data)
+    assert sorted(test["result"] for test in tests) == ["Error", "Failed"]
+    assert len(data["logs"]) == 2
+    assert '<a href="report.html">' in failures_path.read_text()
+
+    report_path = pytester.path.joinpath("report.html")
+    assert failures_path.stat().st_mtime_ns <= report_path.stat().st_mtime_ns
+
+
+@pytest.mark.parametrize(
+    "name, budget",
+    [
+        # built with "npm run build:ci", included in every self-contained report;
+        # the bundle with only whitespace and comments stripped is 37554 bytes,
+        # which terser's output stays below
+        ("app.js", 37 * 1024),
+        # compressed by sass, 3115 bytes with a 15% margin
+        ("style.css", 3584),
+    ],
+)
+def test_packaged_asset_size(name, budget):
+    path = RESOURCES_PATH / name
+    if not path.exists():
+        pytest.skip(f"{name} has not been built")
+    assert path.stat().st_size <= budget
+
+
+def test_environment_table_redact_list(pytester):
+    pytester.makeini(
+        """
+        [pytest]
+        environment_table_redact_list = ^foo$
+            .*redact.*
+            bar
+    """
+    )
+    pytester.makeconftest(
+        """
+        def pytest_configure(config):
+            config._metadata = {
+                "foo": "a",
+                "afoo": "will appear",
+                "foos": "will appear",
+                "will_redact": "ab",
+                "bars": 12345,
+            }
+    """
+    )
+    pytester.makepyfile("def test_pass(): pass")
+    run(pytester)
+
+    data = get_data(pytester.path.joinpath("report.html"))
+    environment = data["environment"]
+    assert environment["foo"] == "▓"
+    assert environment["afoo"] == "will appear"
+    assert environment["foos"] == "will appear"
+    assert environment["will_redact"] == "▓▓"
+    assert environment["bars"] == "▓" * 5
+
+
+@pytest.mark.parametrize(
+    "patterns, redacted",
+    [
+        ([], []),
+        (["^foo$", "bar"], ["foo", "bar", "barn"]),
+        (["(?i)secret", "token"], ["SECRET_KEY", "secret", "token"]),
+        (["(a)\\1"], ["aa"]),
+    ],
+)
+def test_compile_redact_list(patterns, redacted):
+    keys = ["foo", "foos", "bar", "barn", "SECRET_KEY", "secret", "token", "aa"]
+    matcher = _compile_redact_list(patterns)
+    assert [key for key in keys if matcher(key)] == redacted
@@ -1,10 +1,14 @@
 const { expect } = require('chai')
 const sinon = require('sinon')
 const { doInitFilter, doFilter } = require('../src/pytest_html/scripts/filter.js')
-const { doInitSort, doSort } = require('../src/pytest_html/scripts/sort.js')
+const { doInitSort, doSort, genericSort } = require('../src/pytest_html/scripts/sort.js')
 const { formatDuration, transformTableObj } = require('../src/pytest_html/scripts/utils.js')
 const dataModule = require('../src/pytest_html/scripts/datamanager.js')
 const storageModule = require('../src/pytest_html/scripts/storage.js')
+const backend = require('../src/pytest_html/scripts/backend.js')
+const { searchTests, tokenize } = require('../src/pytest_html/scripts/search.js')
+const mediaViewer = require('../src/pytest_html/scripts/mediaviewer.js')
+const { getRenderOrder, renderInChunks } = require('../src/pytest_html/scripts/render.js')
 
 
 const setTestData = () => {
@@ -151,6 +155,302 @@ describe('Sort tests', () => {
                 'passed', 'passed', 'passed', 'passed', 'passed', 'failed',
             ])
         })
+        it('sort on result twice reverses', () => {
+            getSortMock = sinon.stub(storageModule, 'getSort').returns('result')
+            setSortMock = sinon.stub(storageModule, 'setSort')
+            getSortDirectionMock = sinon.stub(storageModule, 'getSortDirection').returns(true)
+            setSortDirection = sinon.stub(storageModule, 'setSortDirection')
+            managerSpy = sinon.spy(dataModule.manager, 'setRender')
+
+            doSort('result')
+            expect(managerSpy.callCount).to.eql(1)
+            expect(dataModule.manager.testSubset.map(({ result }) => result)).to.eql([
+                'failed', 'passed', 'passed', 'passed', 'passed', 'passed',
+            ])
+        })
+    })
+    describe('genericSort', () => {
+        beforeEach(() => dataModule.manager.setManager({ tests: [
+            { result: 'passed', time: '10' },
+            { result: 'failed', time: '9' },
+            { result: 'passed', time: '100' },
+            { result: 'skipped', time: 'n/a' },
+        ] }))
+
+        it('sorts numeric values numerically', () => {
+            const sorted = genericSort(dataModule.manager.allTests, 'time', false)
+            expect(sorted.map(({ time }) => time)).to.eql(['9', '10', '100', 'n/a'])
+        })
+        it('sorts a subset in the same order as the full set', () => {
+            const subset = dataModule.manager.allTests.filter(({ result }) => result === 'passed')
+            expect(genericSort(subset, 'time', true).map(({ time }) => time)).to.eql(['100', '10'])
+        })
+        it('sorts on the values of declared columns', () => {
+            const tests = [
+                { id: 'a', resultsTableValues: { size: 20 } },
+                { id: 'b', resultsTableValues: { size: 3 } },
+                { id: 'c', size: 10, resultsTableValues: { size: 'ten' } },
+            ]
+            expect(genericSort(tests, 'size', false).map(({ id }) => id)).to.eql(['b', 'c', 'a'])
+        })
+        it('sorts on custom order', () => {
+            const sorted = genericSort(dataModule.manager.allTests, 'result', false, ['Failed', 'Skipped', 'Passed'])
+            expect(sorted.map(({ result }) => result)).to.eql(['failed', 'skipped', 'passed', 'passed'])
+        })
+    })
+})
+
+describe('DataManager tests', () => {
+    after(() => dataModule.manager.setManager({ tests: [] }))
+
+    it('decodes columnar tests', () => {
+        const decoded = dataModule.decodeTests({
+            layout: 'columnar',
+            prefixes: [''],
+            strings: ['test_a', 'test_b', 'Passed', 'Failed', '[{"name": "Image"}]'],
+            columns: {
+                nodeid: { type: 'id', values: [[0, 0], [0, 1], [0, 1]] },
+                testId: { type: 'id', values: [[0, 0], [0, 1], [0, 1]] },
+                result: { type: 'string', values: [2, 3, 2] },
+                duration: { type: 'value', values: [1, 2, 3] },
+                extras: { type: 'json', values: [4, null, 4] },
+            },
+        })
+        expect(decoded).to.eql({
+            test_a: [{ testId: 'test_a', result: 'Passed', duration: 1, extras: [{ name: 'Image' }] }],
+            test_b: [
+                { testId: 'test_b', result: 'Failed', duration: 2 },
+                { testId: 'test_b', result: 'Passed', duration: 3, extras: [{ name: 'Image' }] },
+            ],
+        })
+    })
+    it('decodes tests with relative IDs', () => {
+        const decoded = dataModule.decodeTests({
+            layout: 'rows',
+            prefixes: ['a.py::T::', 'a.py::T::test_b::'],
+            tests: [
+                [[0, 'test_a'], [{ testId: [0, 'test_a'], result: 'Passed' }]],
+                [[0, 'test_b'], [{ testId: [1, 'setup'], result: 'Error' }, { testId: [0, 'test_b'] }]],
+            ],
+        })
+        expect(decoded).to.eql({
+            'a.py::T::test_a': [{ testId: 'a.py::T::test_a', result: 'Passed' }],
+            'a.py::T::test_b': [{ testId: 'a.py::T::test_b::setup', result: 'Error' }, { testId: 'a.py::T::test_b' }],
+        })
+    })
+    it('resolves logs from the log table', () => {
+        dataModule.manager.setManager({
+            logs: ['shared log', 'other log'],
+            tests: {
+                test_a: [{ testId: 'test_a', result: 'Failed', log: 0 }],
+                test_b: [{ testId: 'test_b', result: 'Failed', log: 0 }],
+                test_c: [{ testId: 'test_c', result: 'Passed', log: 1 }],
+                test_d: [{ testId: 'test_d', result: 'Passed' }],
+            },
+        }, 'https://example.com/page')
+        expect(dataModule.manager.allTests.map(({ log }) => log)).to.eql(['shared log', 'shared log', 'other log', undefined])
+        expect(dataModule.manager.allData.logs).to.equal(undefined)
+    })
+    it('leaves row based tests as they are', () => {
+        const tests = { test_a: [{ testId: 'test_a' }] }
+        expect(dataModule.decodeTests(tests)).to.equal(tests)
+    })
+})
+
+describe('Backend tests', () => {
+    after(() => dataModule.manager.setManager({ tests: [] }))
+    const payload = JSON.stringify({
+        tests: {
+            'test_a': [{ testId: 'test_a', result: 'Passed', duration: 1 }],
+            'test_b': [{ testId: 'test_b', result: 'Failed', duration: 2 }],
+            'test_c': [{ testId: 'test_c', result: 'Skipped', duration: 0.5 }],
+        },
+    })
+
+    it('loads, filters and sorts without a worker', async () => {
+        await backend.request('load', {
+            payload, href: 'https://example.com/page', visible: ['passed', 'failed'], sort: 'result', ascending: null,
+        })
+        expect(dataModule.manager.testSubset.map(({ testId }) => testId)).to.eql(['test_b', 'test_a'])
+
+        await backend.request('sort', { sort: 'duration', ascending: false })
+        expect(dataModule.manager.testSubset.map(({ testId }) => testId)).to.eql(['test_a', 'test_b'])
+    })
+    it('appends live updates once', async () => {
+        await backend.request('load', {
+            payload, href: 'https://example.com/page', visible: ['passed', 'failed'], sort: 'original', ascending: null,
+        })
+        const records = [
+            { sequence: 1, nodeid: 'test_a', start: 0, tests: [{ testId: 'test_a', result: 'Passed', duration: 1 }] },
+            { sequence: 2, nodeid: 'test_d', start: 0, tests: [{ testId: 'test_d', result: 'Failed', duration: 1 }] },
+            { sequence: 3, state: { runningState: 'Finished' } },
+        ]
+        const { rows } = await backend.request('append', { records, visible: ['passed', 'failed'] })
+        expect(rows.map(({ testId, id }) => `${testId}:${id}`)).to.eql(['test_d:test_3'])
+        expect(dataModule.manager.testSubset.map(({ testId }) => testId)).to.eql(['test_a', 'test_b', 'test_d'])
+        expect(dataModule.manager.summary.counts.failed).to.eql(2)
+        expect(dataModule.manager.isFinished).to.be.true
+    })
+    it('replaces known tests', async () => {
+        await backend.request('load', {
+            payload, href: 'https://example.com/page', visible: ['passed', 'failed'], sort: 'original', ascending: null,
+        })
+        dataModule.manager.toggleCollapsedItem('test_0')
+        const { collapsed } = dataModule.manager.testSubset[0]
+        // build the sort and search caches before the replacement
+        await backend.request('sort', { sort: 'duration', ascending: false })
+        expect(dataModule.manager.testSubset.map(({ testId }) => testId)).to.eql(['test_a', 'test_b'])
+        expect([...searchTests({ query: 'teardown', logs: true })]).to.eql([])
+
+        const records = [{
+            sequence: 1,
+            nodeid: 'test_a',
+            start: 0,
+            tests: [{ testId: 'test_a', result: 'Passed', duration: 3, log: 0 }],
+            logs: { 0: 'teardown output' },
+        }]
+        const { rows, replaced } = await backend.request('append', { records, visible: ['passed', 'failed'] })
+        expect(rows).to.eql([])
+        expect(replaced.map(({ id, log }) => `${id}:${log}`)).to.eql(['test_0:teardown output'])
+        const test = dataModule.manager.testSubset.find(({ id }) => id === 'test_0')
+        expect(test.log).to.eql('teardown output')
+        expect(test.collapsed).to.eql(collapsed)
+        expect(dataModule.manager.allTests.length).to.eql(3)
+
+        expect([...searchTests({ query: 'teardown', logs: true })]).to.eql(['test_0'])
+        await backend.request('sort', { sort: 'duration', ascending: false })
+        expect(dataModule.manager.testSubset.map(({ testId }) => testId)).to.eql(['test_b', 'test_a'])
+    })
+    it('resolves the logs of live updates', async () => {
+        await backend.request('load', {
+            payload: JSON.stringify({ tests: {}, logs: ['known log'] }),
+            href: 'https://example.com/page', visible: ['failed'], sort: 'original', ascending: null,
+        })
+        const records = [
+            { sequence: 1, nodeid: 'test_x', start: 0, tests: [{ testId: 'test_x', result: 'Failed', log: 0 }] },
+            {
+                sequence: 2,
+                nodeid: 'test_y',
+                start: 0,
+                tests: [{ testId: 'test_y', result: 'Failed', log: 1 }],
+                logs: { 1: 'new log' },
+            },
+            { sequence: 3, nodeid: 'test_z', start: 0, tests: [{ testId: 'test_z', result: 'Failed', log: 1 }] },
+        ]
+        const { rows } = await backend.request('append', { records, visible: ['failed'] })
+        expect(rows.map(({ log }) => log)).to.eql(['known log', 'new log', 'new log'])
+    })
+    it('starts the worker from the script', () => {
+        expect(backend.getWorkerScript({ src: '', textContent: 'code' }, 'file:')).to.eql({ source: 'code' })
+        expect(backend.getWorkerScript({ src: 'https://example.com/assets/app.js', textContent: '' }, 'https:'))
+            .to.eql({ url: 'https://example.com/assets/app.js' })
+        expect(backend.getWorkerScript({ src: 'file:///reports/assets/app.js', textContent: '' }, 'file:'))
+            .to.eql(null)
+        const app = function pytestHtmlApp() { return 'code' }
+        expect(backend.getWorkerScript({ src: 'file:///reports/assets/app.js', textContent: '' }, 'file:', app))
+            .to.eql({ source: `(${app})()` })
+    })
+    it('summarizes all tests', async () => {
+        await backend.request('load', {
+            payload, href: 'https://example.com/page', visible: ['passed'], sort: 'original', ascending: null,
+        })
+        expect(dataModule.manager.summary).to.eql({
+            counts: { passed: 1, failed: 1, skipped: 1 },
+            numberOfTests: 2,
+            duration: 3.5,
+        })
+    })
+})
+
+describe('Render tests', () => {
+    const results = ['Passed', 'XPassed', 'Skipped', 'Failed', 'XFailed', 'Error', 'Passed']
+    const tests = results.map((result) => ({ result }))
+
+    it('renders errors, failures and unexpected passes first', () => {
+        expect(getRenderOrder(tests)).to.eql([1, 3, 5, 0, 2, 4, 6])
+    })
+
+    describe('renderInChunks', () => {
+        let clock
+        let scheduled
+        let realPerformance
+        beforeEach(() => {
+            clock = 0
+            scheduled = []
+            realPerformance = global.performance
+            global.performance = { now: () => clock }
+            global.requestIdleCallback = (callback) => scheduled.push(callback)
+        })
+        afterEach(() => {
+            global.performance = realPerformance
+            delete global.requestIdleCallback
+        })
+        const runScheduled = () => {
+            while (scheduled.length) {
+                scheduled.shift()()
+            }
+        }
+        // every row takes 60ms, so a chunk renders one or two rows
+        const renderer = (rendered, name) => (index) => {
+            clock += 60
+            rendered.push(`${name}${index}`)
+        }
+
+        it('renders all rows in chunks', () => {
+            const rendered = []
+            renderInChunks(tests, renderer(rendered, ''))
+            expect(rendered).to.eql(['1', '3'])
+            expect(scheduled.length).to.eql(1)
+
+            runScheduled()
+            expect(rendered).to.eql(['1', '3', '5', '0', '2', '4', '6'])
+        })
+        it('cancels the pending chunks of a previous render', () => {
+            const rendered = []
+            renderInChunks(tests, renderer(rendered, 'old'))
+            renderInChunks(tests.slice(0, 2), renderer(rendered, 'new'))
+            runScheduled()
+            expect(rendered).to.eql(['old1', 'old3', 'new1', 'new0'])
+        })
+    })
+})
+
+describe('Search tests', () => {
+    beforeEach(() => dataModule.manager.setManager({ tests: [
+        { testId: 'tests/api/test_orders.py::test_create', result: 'passed', log: 'ok' },
+        { testId: 'tests/api/test_orders.py::test_delete', result: 'failed', log: 'KeyError: missing' },
+        { testId: 'tests/ui/test_login.py::test_login', result: 'passed', resultsTableRow: {
+            '2': '<td class="col-owner">frontend</td>',
+        } },
+    ] }))
+    after(() => dataModule.manager.setManager({ tests: [] }))
+
+    it('tokenizes words and snake_case parts', () => {
+        expect([...tokenize('test_orders.py::Test')]).to.eql(['test_orders', 'test', 'orders', 'py'])
+    })
+    it('returns null without a query', () => {
+        expect(searchTests({ query: ' ' })).to.eql(null)
+        expect(searchTests(null)).to.eql(null)
+        expect(searchTests()).to.eql(null)
+    })
+    it('matches every term by prefix', () => {
+        expect([...searchTests({ query: 'orders cre' })]).to.eql(['test_0'])
+        expect([...searchTests({ query: 'test_orders' })]).to.eql(['test_0', 'test_1'])
+    })
+    it('matches custom columns', () => {
+        expect([...searchTests({ query: 'frontend' })]).to.eql(['test_2'])
+    })
+    it('only matches logs when asked to', () => {
+        expect([...searchTests({ query: 'keyerror' })]).to.eql([])
+        expect([...searchTests({ query: 'keyerror', logs: true })]).to.eql(['test_1'])
+    })
+    it('filters without a search', async () => {
+        await backend.request('filter', { visible: ['passed'], search: null })
+        expect(dataModule.manager.testSubset.map(({ id }) => id)).to.eql(['test_0', 'test_2'])
+    })
+    it('filters on search results', async () => {
+        await backend.request('filter', { visible: ['passed', 'failed'], search: { query: 'api' } })
+        expect(dataModule.manager.testSubset.map(({ id }) => id)).to.eql(['test_0', 'test_1'])
     })
 })
 
@@ -263,3 +563,98 @@ describe('Storage tests', () => {
         })
     })
 })
+
+describe('MediaViewer tests', () => {
+    const fakeElement = () => {
+        const attributes = new Map()
+        const classes = new Set()
+        return {
+            classList: { add: (name) => classes.add(name), remove: (name) => classes.delete(name) },
+            get src() {
+                return attributes.get('src')
+            },
+            set src(value) {
+                attributes.set('src', value)
+            },
+            getAttribute: (name) => attributes.get(name) ?? null,
+            removeAttribute: (name) => attributes.delete(name),
+            addEventListener: () => {},
+            load: () => {},
+        }
+    }
+    const fakeResultBody = () => {
+        const elements = {}
+        return {
+            querySelector: (selector) => {
+                elements[selector] = elements[selector] || fakeElement()
+                return elements[selector]
+            },
+        }
+    }
+    const assets = [
+        { path: 'data:image/png;base64,AAAA', name: 'Image', format_type: 'image' },
+        { path: 'video.mp4', name: 'Video', format_type: 'video' },
+    ]
+
+    it('loads right away without IntersectionObserver', () => {
+        const resultBody = fakeResultBody()
+        mediaViewer.setUp(resultBody, assets)
+        expect(resultBody.querySelector('img').src).to.eql(assets[0].path)
+    })
+
+    describe('with IntersectionObserver', () => {
+        let observer
+        before(() => {
+            global.IntersectionObserver = class {
+                constructor(callback) {
+                    observer = this
+                    this.callback = callback
+                    this.observed = new Set()
+                }
+                observe(target) {
+                    this.observed.add(target)
+                }
+                unobserve(target) {
+                    this.observed.delete(target)
+                }
+            }
+        })
+        after(() => {
+            delete global.IntersectionObserver
+        })
+        const show = (resultBody) => observer.callback([
+            { isIntersecting: true, target: resultBody.querySelector('.media') },
+        ])
+
+        it('loads media once they are in view', () => {
+            const resultBody = fakeResultBody()
+            mediaViewer.setUp(resultBody, assets)
+            const imageEl = resultBody.querySelector('img')
+            expect(imageEl.loading).to.eql('lazy')
+            expect(resultBody.querySelector('video').preload).to.eql('none')
+            expect(imageEl.src).to.equal(undefined)
+
+            show(resultBody)
+            expect(imageEl.src).to.eql(assets[0].path)
+            expect(observer.observed.has(resultBody.querySelector('.media'))).to.be.false
+        })
+        it('releases media when collapsed', () => {
+            const resultBody = fakeResultBody()
+            mediaViewer.setUp(resultBody, assets)
+            show(resultBody)
+
+            mediaViewer.release(resultBody)
+            expect(resultBody.querySelector('img').src).to.equal(undefined)
+            expect(observer.observed.has(resultBody.querySelector('.media'))).to.be.true
+
+            show(resultBody)
+            expect(resultBody.querySelector('img').src).to.eql(assets[0].path)
+        })
+        it('ignores rows without media', () => {
+            const resultBody = fakeResultBody()
+            mediaViewer.setUp(resultBody, [])
+            mediaViewer.release(resultBody)
+            expect(observer.observed.size).to.eql(0)
+        })
+    })
+})